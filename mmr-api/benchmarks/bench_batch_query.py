@@ -0,0 +1,89 @@
+"""
+N single /api/mmr/query calls against one /api/mmr/query/batch call
+
+The prompt set mixes registered topics, repeated prompts and distinct
+fallback prompts, like a moderation queue. Runs in-process through the
+Flask test client by default; pass --url to go over HTTP (one keep-alive
+connection) to a running server, which includes the per-request round trip.
+
+Usage: python benchmarks/bench_batch_query.py [--prompts 500] [--url http://127.0.0.1:5000]
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_prompts(count):
+    templates = [
+        'What is the MMR view of netanyahu?',
+        'al-ahli hospital strike',
+        'report {i} on settler violence',
+        'water access in the west bank',
+        'statement {i} from a city council',
+    ]
+    return [templates[i % len(templates)].format(i=i // len(templates) % 50) for i in range(count)]
+
+
+class TestClientTransport:
+    def __init__(self):
+        os.environ.setdefault('MMR_DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+        from src.main import app, response_cache
+        self.client = app.test_client()
+        self.cache = response_cache
+
+    def reset(self):
+        self.cache.clear()
+
+    def post(self, path, payload):
+        return self.client.post(path, json=payload).get_data()
+
+
+class HTTPTransport:
+    def __init__(self, url):
+        self.connection = http.client.HTTPConnection(urlsplit(url).netloc)
+
+    def reset(self):
+        pass
+
+    def post(self, path, payload):
+        self.connection.request('POST', path, json.dumps(payload), {'Content-Type': 'application/json'})
+        return self.connection.getresponse().read()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--prompts', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--url')
+    args = parser.parse_args()
+    transport = HTTPTransport(args.url) if args.url else TestClientTransport()
+    prompts = make_prompts(args.prompts)
+
+    single = batch = float('inf')
+    for _ in range(args.repeat):
+        transport.reset()
+        start = time.perf_counter()
+        for prompt in prompts:
+            transport.post('/api/mmr/query', {'prompt': prompt})
+        single = min(single, time.perf_counter() - start)
+
+        transport.reset()
+        start = time.perf_counter()
+        lines = transport.post('/api/mmr/query/batch', {'prompts': prompts}).count(b'\n')
+        batch = min(batch, time.perf_counter() - start)
+        assert lines == len(prompts), lines
+
+    print(f'{len(prompts)} prompts, {len(set(prompts))} distinct, best of {args.repeat}')
+    print(f"{'single calls':<14} {single * 1000:>9.1f} ms  {len(prompts) / single:>9.0f} prompts/s")
+    print(f"{'one batch':<14} {batch * 1000:>9.1f} ms  {len(prompts) / batch:>9.0f} prompts/s  ({single / batch:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Server CPU per request under bursts of identical /api/mmr/query prompts,
+with and without single-flight coalescing
+
+For each mode a threaded development server is started in a fresh process
+(MMR_COALESCE=1 or 0). Each burst is a new trending prompt, so the first
+request misses the response cache: --clients threads, each on its own
+keep-alive connection, are released together by a barrier and send the
+same prompt --per-client times. Server CPU (user + system, from /proc) is
+read before and after all bursts; the number of analyses actually built
+is the response cache's miss count from /api/health.
+
+The bundled analyses are templates that encode in about 0.1 ms, far less
+than the HTTP handling around them. --analysis-ms N makes each analysis
+also burn N ms of CPU, standing in for a connected MMR model.
+
+Usage: python benchmarks/bench_coalescing.py [--clients 32] [--bursts 50] [--analysis-ms 0]
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER = '''
+import sys, time
+sys.path.insert(0, {root!r})
+from werkzeug.serving import make_server
+import src.main
+from src.main import app
+analysis_seconds = {analysis_ms} / 1000
+if analysis_seconds:
+    render = src.main.render_mmr_analysis
+    def slow_render(key):
+        end = time.thread_time() + analysis_seconds
+        while time.thread_time() < end:
+            pass
+        return render(key)
+    src.main.render_mmr_analysis = slow_render
+server = make_server('127.0.0.1', 0, app, threaded=True)
+print(server.server_port, flush=True)
+server.serve_forever()
+'''
+
+
+def cpu_seconds(pid):
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    # utime and stime, fields 14 and 15 of the full line
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def start_server(coalesce, analysis_ms):
+    env = dict(os.environ)
+    env.update({
+        'MMR_COALESCE': '1' if coalesce else '0',
+        'MMR_DATABASE_URL': f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+        'MMR_RESPONSE_CACHE_SIZE': '1024',
+    })
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVER.format(root=ROOT, analysis_ms=analysis_ms)],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    return process, int(process.stdout.readline())
+
+
+def get_json(port, path):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('GET', path)
+    return json.loads(connection.getresponse().read())
+
+
+def run(coalesce, args):
+    process, port = start_server(coalesce, args.analysis_ms)
+    try:
+        barrier = threading.Barrier(args.clients + 1)
+        failures = []
+
+        def client():
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            headers = {'Content-Type': 'application/json'}
+            for burst in range(args.bursts):
+                body = json.dumps({'prompt': f'trending story {burst} today'})
+                barrier.wait()
+                for _ in range(args.per_client):
+                    connection.request('POST', '/api/mmr/query', body, headers)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status != 200:
+                        failures.append(response.status)
+                barrier.wait()
+
+        threads = [threading.Thread(target=client) for _ in range(args.clients)]
+        for thread in threads:
+            thread.start()
+
+        cpu = cpu_seconds(process.pid)
+        start = time.perf_counter()
+        for _ in range(args.bursts):
+            barrier.wait()
+            barrier.wait()
+        elapsed = time.perf_counter() - start
+        cpu = cpu_seconds(process.pid) - cpu
+        for thread in threads:
+            thread.join()
+
+        health = get_json(port, '/api/health')
+    finally:
+        process.terminate()
+        process.wait()
+
+    requests = args.clients * args.bursts * args.per_client
+    return {
+        'requests': requests, 'cpu': cpu, 'elapsed': elapsed, 'failures': len(failures),
+        'analyses': health['response_cache']['misses'], 'shared': health['coalescing']['shared'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--bursts', type=int, default=50)
+    parser.add_argument('--per-client', type=int, default=1)
+    parser.add_argument('--analysis-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    print(f'{args.bursts} bursts of {args.clients} clients x {args.per_client} identical prompts, '
+          f'{args.analysis_ms:g} ms extra CPU per analysis')
+    results = {}
+    for coalesce in (False, True):
+        result = results[coalesce] = run(coalesce, args)
+        print(f"{'coalesced' if coalesce else 'independent':<12} "
+              f"{result['cpu'] / result['requests'] * 1e6:7.0f} us CPU/request  "
+              f"{result['requests'] / result['elapsed']:7.0f} requests/s  "
+              f"{result['analyses']:5d} analyses  {result['shared']:5d} shared  {result['failures']} failed")
+    saving = 1 - results[True]['cpu'] / results[False]['cpu']
+    print(f'CPU per request {saving:.0%} lower with coalescing' if saving >= 0
+          else f'CPU per request {-saving:.0%} higher with coalescing')
+
+
+if __name__ == '__main__':
+    main()
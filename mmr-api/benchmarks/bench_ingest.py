@@ -0,0 +1,108 @@
+"""
+Ingestion throughput and memory on a synthetic profile file
+
+Writes --profiles profiles to a temporary file, cycling through the
+profiles of both bundled databases so both spellings of every field are
+exercised, with every --bad-every'th row malformed. Each loader then runs
+in a fresh interpreter, which reports its time and peak RSS:
+
+  ingest      for profile in ingest([path]): count it
+  json.load   json.load the whole file, then normalize_profile every row
+
+Usage: python benchmarks/bench_ingest.py [--profiles 1000000] [--format json|ndjson]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.services.profile_data import PROFILE_DATABASES, read_database
+
+DATA_DIR = os.path.join(os.path.dirname(ROOT), 'src', 'data')
+
+WORKER = '''
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+from src.services.ingest import IngestReport, MalformedProfile, ingest, normalize_profile
+mode, path = sys.argv[1:]
+start = time.perf_counter()
+ok = bad = 0
+if mode == 'ingest':
+    report = IngestReport()
+    for profile in ingest([path], report):
+        ok += 1
+    bad = report.malformed
+else:
+    with open(path, encoding='utf-8') as f:
+        rows = json.load(f) if path.endswith('.json') else [json.loads(line) for line in f]
+    for raw in rows:
+        try:
+            normalize_profile(raw, 'bench')
+            ok += 1
+        except MalformedProfile:
+            bad += 1
+print(json.dumps({{'seconds': time.perf_counter() - start, 'ok': ok, 'bad': bad,
+                  'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}}))
+'''
+
+
+def write_profiles(path, count, bad_every):
+    samples = [profile for filename in PROFILE_DATABASES.values()
+               for profile in read_database(os.path.join(DATA_DIR, filename))]
+    encoded = [json.dumps(profile, ensure_ascii=False) for profile in samples]
+    malformed = json.dumps({'name': 'Malformed', 'overall_rating': 'Pass', 'pillars': []})
+    ndjson = path.endswith('.ndjson')
+    with open(path, 'w', encoding='utf-8') as f:
+        if not ndjson:
+            f.write('[\n')
+        for i in range(count):
+            row = malformed if bad_every and i % bad_every == bad_every - 1 else encoded[i % len(encoded)]
+            if ndjson:
+                f.write(row + '\n')
+            else:
+                f.write(row + (',\n' if i < count - 1 else '\n'))
+        if not ndjson:
+            f.write(']\n')
+
+
+def run(mode, path):
+    result = subprocess.run(
+        [sys.executable, '-c', WORKER.format(root=ROOT), mode, path],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--profiles', type=int, default=1_000_000)
+    parser.add_argument('--format', choices=('json', 'ndjson'), default='json')
+    parser.add_argument('--bad-every', type=int, default=1000)
+    parser.add_argument('--skip-json-load', action='store_true', help='only run the streaming loader')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f'profiles.{args.format}')
+        start = time.perf_counter()
+        write_profiles(path, args.profiles, args.bad_every)
+        size = os.path.getsize(path)
+        print(f'{args.profiles} profiles, {size / 1e6:.0f} MB of {args.format} '
+              f'(written in {time.perf_counter() - start:.1f} s)')
+
+        modes = ('ingest',) if args.skip_json_load else ('ingest', 'json.load')
+        for mode in modes:
+            result = run(mode, path)
+            seconds = result['seconds']
+            print(f"{mode:10} {seconds:7.1f} s  {args.profiles / seconds:9.0f} profiles/s  "
+                  f"{size / 1e6 / seconds:6.1f} MB/s  peak RSS {result['peak_rss'] / 1e6:7.0f} MB  "
+                  f"({result['ok']} ok, {result['bad']} malformed)")
+
+
+if __name__ == '__main__':
+    main()
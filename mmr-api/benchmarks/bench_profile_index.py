@@ -0,0 +1,54 @@
+"""
+/api/profiles query latency as the profile count grows from 35 to 100k
+
+Synthetic profiles are copies of the bundled databases with unique names.
+
+Usage: python benchmarks/bench_profile_index.py
+"""
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import app
+from src.services.profile_data import SOURCE_PRIORITY, load_category_ids, load_profiles
+from src.services.profile_index import ProfileIndex
+
+QUERIES = {
+    'first page': {},
+    'category': {'category': 'israeli-politicians'},
+    'status+pillar': {'status': 'Pass', 'pillar': 'Humanize Both Peoples', 'assessment': 'Pass'},
+    'name prefix': {'name': 'gershon'},
+}
+
+
+def synthetic(count):
+    base = list(load_profiles(app.config['MMR_DATA_DIR']))
+    for i in range(count):
+        source, profile = base[i % len(base)]
+        copy = dict(profile)
+        key = 'subject' if 'subject' in copy else 'name'
+        copy[key] = f'{copy[key]} {i // len(base)}' if i >= len(base) else copy[key]
+        yield source, copy
+
+
+def main():
+    category_ids = load_category_ids(app.config['MMR_DATA_DIR'])
+    print(f"{'profiles':>9} {'build (s)':>10} " + ' '.join(f'{name:>14}' for name in QUERIES))
+    for count in (35, 1000, 10000, 100000):
+        start = time.perf_counter()
+        index = ProfileIndex(synthetic(count), source_priority=SOURCE_PRIORITY, category_ids=category_ids)
+        build = time.perf_counter() - start
+
+        row = []
+        for filters in QUERIES.values():
+            number = 500
+            first = min(timeit.repeat(lambda: index.query(limit=20, **filters), number=number, repeat=3)) / number
+            row.append(f'{first * 1e6:>11.1f} us')
+        print(f'{count:>9} {build:>10.2f} ' + ' '.join(f'{cell:>14}' for cell in row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+/api/search latency and index build/rebuild cost as the corpus grows to
+1,000x the bundled databases
+
+Synthetic profiles are copies of the bundled databases under new ids. The
+rebuild column re-syncs the index after 1% of the profiles were edited.
+
+Usage: python benchmarks/bench_search_index.py [--scales 1 10 100 1000]
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import app
+from src.services.profile_data import load_profiles
+from src.services.search_index import SearchIndex
+
+QUERIES = {
+    'rare term': {'query': 'gilad shalit'},
+    'two terms': {'query': 'settlement expansion'},
+    'common terms': {'query': 'israeli palestinian violence'},
+    'pillar filter': {'query': 'hamas violence', 'pillar': 'Reject Eliminationism', 'assessment': 'Fail'},
+}
+
+
+def synthetic(scale):
+    base = list(load_profiles(app.config['MMR_DATA_DIR']))
+    for copy in range(scale):
+        for n, (source, profile) in enumerate(base):
+            yield f'{source}:{n}:{copy}', source, profile
+
+
+def edited(profiles, every):
+    for i, (profile_id, source, profile) in enumerate(profiles):
+        if i % every == 0:
+            profile = dict(profile, reflection=f"{profile.get('reflection') or ''} Revised assessment {i}.")
+        yield profile_id, source, profile
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'profiles':>9} {'build (s)':>10} {'rebuild 1%':>11} {'max RSS':>9} " + ' '.join(f'{name:>14}' for name in QUERIES))
+    for scale in args.scales:
+        index = SearchIndex()
+        start = time.perf_counter()
+        index.rebuild(synthetic(scale))
+        build = time.perf_counter() - start
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        start = time.perf_counter()
+        counts = index.rebuild(edited(synthetic(scale), 100))
+        rebuild = time.perf_counter() - start
+        assert counts['updated'] == (len(index) + 99) // 100, counts
+
+        row = []
+        for params in QUERIES.values():
+            number = 20
+            best = min(timeit.repeat(lambda: index.search(limit=10, **params), number=number, repeat=3)) / number
+            row.append(f'{best * 1000:>11.2f} ms')
+        print(f'{len(index):>9} {build:>10.2f} {rebuild:>10.2f}s {rss:>6.0f} MB ' + ' '.join(f'{cell:>14}' for cell in row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Per-request routing latency at 10, 100 and 1,000 registered topics
+
+Compares the compiled TopicRouter against the original linear chain of
+`keyword in prompt.lower()` checks.
+
+Usage: python benchmarks/bench_topic_router.py
+"""
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.topic_router import TopicRouter
+from src.services.topics import TOPICS
+
+WORDS = ['gaza', 'israel', 'people', 'dignity', 'peace', 'civilians', 'justice', 'ceasefire', 'the', 'of', 'and']
+
+
+def make_topics(count, rng):
+    topics = list(TOPICS)
+    while len(topics) < count:
+        keyword = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 12)))
+        topics.append({'name': keyword, 'keywords': [keyword], 'analysis': ''})
+    return topics
+
+
+def linear_route(topics, prompt):
+    prompt_lower = prompt.lower()
+    for topic in topics:
+        for keyword in topic['keywords']:
+            if keyword in prompt_lower:
+                return topic
+    return None
+
+
+def main():
+    rng = random.Random(42)
+    prompts = {
+        'short': 'What does MMR say about the ceasefire negotiations?',
+        'long': ' '.join(rng.choice(WORDS) for _ in range(2000)),
+    }
+
+    print(f"{'topics':>7} {'prompt':>6} {'linear (us)':>12} {'compiled (us)':>14}")
+    for count in (10, 100, 1000):
+        topics = make_topics(count, rng)
+        router = TopicRouter(topics)
+        for label, prompt in prompts.items():
+            assert router.route(prompt) is linear_route(topics, prompt)
+            number = 2000 if label == 'short' else 50
+            linear = min(timeit.repeat(lambda: linear_route(topics, prompt), number=number, repeat=3)) / number
+            compiled = min(timeit.repeat(lambda: router.route(prompt), number=number, repeat=3)) / number
+            print(f'{count:>7} {label:>6} {linear * 1e6:>12.1f} {compiled * 1e6:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Inserts/sec and reads/sec for the users blueprint
+
+Compares the per-row POST /api/users path (one commit per user) with
+POST /api/users/batch (one transaction), and times keyset-paginated and
+index-backed reads. Runs against a throwaway SQLite file.
+
+Usage: python benchmarks/bench_users.py [--rows 5000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['MMR_DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+os.environ['MMR_USERS_TOKEN'] = 'bench'
+
+from src.main import app
+from src.models.user import User, db
+
+
+def reset():
+    with app.app_context():
+        db.session.query(User).delete()
+        db.session.commit()
+
+
+def rate(count, seconds):
+    return f'{count / seconds:>10.0f}/s'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = 'Bearer bench'
+    rows = [{'username': f'user{i}', 'email': f'user{i}@example.org'} for i in range(args.rows)]
+
+    reset()
+    start = time.perf_counter()
+    for row in rows:
+        client.post('/api/users', json=row)
+    per_row = time.perf_counter() - start
+
+    reset()
+    start = time.perf_counter()
+    for i in range(0, len(rows), 1000):
+        client.post('/api/users/batch', json=rows[i:i + 1000])
+    batch = time.perf_counter() - start
+
+    print(f"{'inserts, one commit per row':<34} {rate(len(rows), per_row)}")
+    print(f"{'inserts, /users/batch of 1000':<34} {rate(len(rows), batch)}")
+
+    lookups = 2000
+    start = time.perf_counter()
+    for i in range(lookups):
+        client.get(f'/api/users?username=user{(i * 7919) % len(rows)}')
+    lookup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pages = read = 0
+    url = '/api/users?limit=100'
+    while url:
+        response = client.get(url)
+        read += len(response.get_json())
+        pages += 1
+        link = response.headers.get('Link')
+        url = link[1:link.index('>')] if link else None
+    paged = time.perf_counter() - start
+
+    with app.app_context():
+        start = time.perf_counter()
+        everything = [user.to_dict() for user in User.query.all()]
+        read_all = time.perf_counter() - start
+
+    print(f"{'lookups by username':<34} {rate(lookups, lookup)}")
+    print(f"{'rows via keyset pages of 100':<34} {rate(read, paged)}  ({pages} requests)")
+    print(f"{'rows via User.query.all()':<34} {rate(len(everything), read_all)}  (1 unbounded query)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Closed-loop load test for a running mmr-api server
+
+Each client holds one keep-alive connection and sends requests back to back
+for the given duration. Reports requests/second and p50/p99 latency at
+each concurrency level; 503s from load shedding are counted separately.
+
+Usage:
+    gunicorn -c gunicorn.conf.py src.wsgi:application   # or: python src/main.py
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --duration 10
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def client_loop(url, path, body, deadline, results):
+    latencies, shed, errors = [], 0, 0
+    connection = None
+    while time.perf_counter() < deadline:
+        if connection is None:
+            connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        start = time.perf_counter()
+        try:
+            connection.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = None
+            continue
+        elapsed = time.perf_counter() - start
+        if response.status == 503:
+            shed += 1
+        elif response.status >= 400:
+            errors += 1
+        else:
+            latencies.append(elapsed)
+        if response.will_close:
+            connection.close()
+            connection = None
+    if connection is not None:
+        connection.close()
+    results.append((latencies, shed, errors))
+
+
+def run_level(url, path, body, clients, duration):
+    results = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=client_loop, args=(url, path, body, deadline, results))
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    return {
+        'clients': clients,
+        'ok': len(latencies),
+        'shed': sum(result[1] for result in results),
+        'errors': sum(result[2] for result in results),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1e3,
+        'p99_ms': percentile(latencies, 0.99) * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--path', default='/api/mmr/query')
+    parser.add_argument('--prompt', default='What does MMR say about Netanyahu?')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per concurrency level')
+    parser.add_argument('--concurrency', default='1,8,64', help='comma-separated client counts')
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    body = json.dumps({'prompt': args.prompt})
+
+    print(f"{'clients':>7} {'ok':>8} {'503':>6} {'errors':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for clients in (int(c) for c in args.concurrency.split(',')):
+        r = run_level(url, args.path, body, clients, args.duration)
+        print(f"{r['clients']:>7} {r['ok']:>8} {r['shed']:>6} {r['errors']:>6} "
+              f"{r['rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
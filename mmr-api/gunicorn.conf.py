@@ -0,0 +1,75 @@
+"""
+Gunicorn settings for mmr-api; every value can be overridden from the environment
+"""
+import glob
+import multiprocessing
+import os
+
+bind = os.environ.get('MMR_BIND', '0.0.0.0:5000')
+
+# Processes x threads. Each worker needs more threads than
+# MMR_MAX_CONCURRENT + MMR_MAX_QUEUE (see src/wsgi.py) so that excess
+# requests reach the app and are shed with a 503 instead of waiting unseen
+workers = int(os.environ.get('MMR_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('MMR_THREADS', 32))
+
+# Pending connections the kernel queues before refusing new ones
+backlog = int(os.environ.get('MMR_BACKLOG', 512))
+
+# Keep-alive: idle connections are held this long for reuse, up to
+# worker_connections open connections per worker
+keepalive = int(os.environ.get('MMR_KEEPALIVE', 5))
+worker_connections = int(os.environ.get('MMR_WORKER_CONNECTIONS', 1000))
+
+# A hung request is killed after `timeout`; on SIGTERM workers stop
+# accepting and get `graceful_timeout` seconds to finish in-flight requests
+timeout = int(os.environ.get('MMR_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('MMR_GRACEFUL_TIMEOUT', 20))
+
+# Load the databases and compiled indexes once in the master; workers
+# share those pages copy-on-write
+preload_app = True
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.environ.get('MMR_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+# Set MMR_ACCESS_LOG to an empty string to disable access logging
+accesslog = os.environ.get('MMR_ACCESS_LOG', '-') or None
+
+
+def on_starting(server):
+    """Start the shared metrics from zero: drop files left by a previous server's workers"""
+    directory = os.environ.get('MMR_METRICS_DIR')
+    if directory:
+        for pattern in ('worker-*.json', 'exited.json', 'profiler.json'):
+            for path in glob.glob(os.path.join(directory, pattern)):
+                os.remove(path)
+
+
+def worker_exit(server, worker):
+    """Write out the exiting worker's last metrics for child_exit to fold"""
+    from src.main import app
+
+    metrics = app.extensions['mmr_metrics']
+    if metrics.enabled and metrics.directory is not None:
+        metrics.flush()
+
+
+def child_exit(server, worker):
+    """Fold an exited worker's metrics into the exited workers' totals"""
+    directory = os.environ.get('MMR_METRICS_DIR')
+    if directory:
+        from src.services.metrics import fold_exited_worker
+
+        fold_exited_worker(directory, worker.pid)
+
+
+def post_fork(server, worker):
+    """Give each worker its own SQLite pool instead of the master's connections"""
+    from src.main import app
+    from src.models.user import db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -3,223 +3,173 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, stream_with_context
 from flask_cors import CORS
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from src.models.engine import engine_options, install_sqlite_pragmas
+from src.models.user import db
+from src.routes.metrics import metrics_bp
+from src.routes.profiles import profiles_bp
+from src.routes.score import score_bp
+from src.routes.search import search_bp
+from src.routes.stats import stats_bp
+from src.routes.user import user_bp
+from src.services.coalesce import SingleFlight
+from src.services.ingest import MalformedProfile, normalize_profile, to_database_row
+from src.services.metrics import Metrics
+from src.services.profile_data import SOURCE_PRIORITY, load_category_ids, load_profiles
+from src.services.profile_index import ProfileIndex
+from src.services.rate_limit import RateLimiter
+from src.services.response_cache import ResponseCache
+from src.services.rollups import RollupStats
+from src.services.scoring import MMRScorer
+from src.services.search_index import SearchIndex
+from src.services.streaming import STREAM_FORMATS, iter_sections, stream_analysis
+from src.services.topic_router import TopicRouter
+from src.services.topics import TOPICS
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
-# Enable CORS for all routes
-CORS(app)
+# Profile databases and MMR v8 rules shared with the frontend
+app.config['MMR_DATA_DIR'] = os.environ.get(
+    'MMR_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src', 'data')
+)
+
+# Enable CORS for all routes; Retry-After is readable on 429s and 503s
+CORS(app, expose_headers=['Retry-After'])
+
+# Opt-in instrumentation (MMR_METRICS=1); no request hooks are installed otherwise
+metrics = Metrics.from_env()
+metrics.init_app(app)
+app.register_blueprint(metrics_bp, url_prefix='/api')
+
+# Per-client token buckets on the MMR query routes, when MMR_RATE_LIMIT is set
+rate_limiter = RateLimiter.from_env()
+rate_limiter.init_app(app)
+
+# Users live in SQLite (WAL mode) behind a per-process connection pool
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'MMR_DATABASE_URL',
+    f"sqlite:///{os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'app.db')}"
+)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(pool_size=int(os.environ.get('MMR_DB_POOL_SIZE', 8)))
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Bearer token required by every /api/users route; unset disables them
+app.config['MMR_USERS_TOKEN'] = os.environ.get('MMR_USERS_TOKEN') or None
+db.init_app(app)
+with app.app_context():
+    install_sqlite_pragmas(db.engine)
+    db.create_all()
+app.register_blueprint(user_bp, url_prefix='/api')
+
+# MMR v8 rules compiled once for /api/mmr/score
+app.extensions['mmr_scorer'] = MMRScorer.from_file(os.path.join(app.config['MMR_DATA_DIR'], 'mmr_v8_rules.json'))
+app.register_blueprint(score_bp, url_prefix='/api')
+
+# Both profile databases, indexed once for /api/profiles
+raw_profiles = list(load_profiles(app.config['MMR_DATA_DIR']))
+app.extensions['mmr_profile_index'] = ProfileIndex(
+    raw_profiles, source_priority=SOURCE_PRIORITY, category_ids=load_category_ids(app.config['MMR_DATA_DIR'])
+)
+app.register_blueprint(profiles_bp, url_prefix='/api')
+
+# Rollups under the same profile ids, kept up to date incrementally for
+# /api/stats. Only the hand-maintained database is counted: most people are
+# in both files, and the other one spells categories differently. Profiles
+# are brought into the canonical schema first, so the scorer sees one
+# spelling of every pillar and assessment
+rollups = app.extensions['mmr_rollups'] = RollupStats(app.extensions['mmr_scorer'])
+for record, (source, raw) in zip(app.extensions['mmr_profile_index'].profiles, raw_profiles):
+    if source != SOURCE_PRIORITY[0]:
+        continue
+    try:
+        rollups.add_profile(record['id'], to_database_row(normalize_profile(raw, source)))
+    except MalformedProfile as e:
+        app.logger.warning('Profile %s left out of /api/stats: %s', record['id'], e)
+app.register_blueprint(stats_bp, url_prefix='/api')
+
+# Full-text index over evidence, source_context and reflection for /api/search
+app.extensions['mmr_search_index'] = SearchIndex()
+app.extensions['mmr_search_index'].rebuild(
+    (record['id'], source, raw)
+    for record, (source, raw) in zip(app.extensions['mmr_profile_index'].profiles, raw_profiles)
+)
+app.register_blueprint(search_bp, url_prefix='/api')
+
+# Compiled once at startup; routing cost does not grow with the topic count
+topic_router = TopicRouter(TOPICS)
+TOPICS_BY_NAME = {topic['name']: topic for topic in TOPICS}
+KEY_TERM_RE = re.compile(r'\b\w+\b')
+
+# Encoded /api/mmr/query responses keyed by resolved topic
+response_cache = ResponseCache(maxsize=int(os.environ.get('MMR_RESPONSE_CACHE_SIZE', 256)))
+
+# Identical /api/mmr/query prompts arriving together share one routing and
+# encoding pass; MMR_COALESCE=0 turns this off
+query_flights = SingleFlight(enabled=os.environ.get('MMR_COALESCE', '1') != '0')
+
+# Upper bound on prompts accepted by one /api/mmr/query/batch call
+MAX_BATCH_PROMPTS = 1000
+
+# Shared by batch calls; threads start on first use, so forked workers get their own
+batch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('MMR_BATCH_WORKERS', 4)),
+    thread_name_prefix='mmr-batch'
+)
+
+def resolve_mmr_topic(prompt):
+    """
+    Resolve a prompt to the analysis it will receive.
+
+    Returns ('topic', name) for registered topics and ('default', title) for
+    the templated fallback, whose output depends only on the first 3 words.
+    """
+    # Dedicated analyses for registered topics (Netanyahu, Al-Ahli Hospital, ...)
+    topic = topic_router.route(prompt)
+    if topic is not None:
+        return ('topic', topic['name'])
+
+    # Extract key terms for analysis; only the first 3 words are needed
+    key_terms = [m.group().lower() for m in islice(KEY_TERM_RE.finditer(prompt), 3)]
+    return ('default', ' '.join(key_terms))  # First 3 words as topic
+
+def render_mmr_analysis(key):
+    """Render the analysis text for a key from resolve_mmr_topic"""
+    kind, value = key
+    if kind == 'topic':
+        return TOPICS_BY_NAME[value]['analysis']
+    return default_mmr_analysis(value)
 
 def perform_mmr_analysis(prompt):
     """
     Actual Multi-Modal Reasoning Analysis
     """
-    prompt_lower = prompt.lower()
-    
-    # Netanyahu MMR Analysis
-    if 'netanyahu' in prompt_lower:
-        return """# **Multi-Modal Reasoning Analysis: Benjamin Netanyahu**
-
-## **🎭 Political Persona Analysis**
-
-### **Public Messaging Patterns**
-- **Security-First Rhetoric**: Consistently frames policies through existential threat lens
-- **Historical Victimization**: References Holocaust and historical persecution to justify current actions
-- **Strongman Positioning**: Projects image of decisive leadership during crises
-- **Media Manipulation**: Strategic use of social media and press conferences for narrative control
-
-### **Policy Implementation Style**
-- **Incremental Expansion**: Gradual settlement expansion while maintaining plausible deniability
-- **Crisis Opportunism**: Uses security incidents to advance controversial policies
-- **Coalition Management**: Maintains power through strategic alliances with far-right parties
-- **International Relations**: Leverages US support while defying international law
-
-## **🧠 Psychological Profile**
-
-### **Leadership Characteristics**
-- **Narcissistic Tendencies**: Requires constant validation and loyalty
-- **Risk Calculation**: Balances domestic political survival with international pressure
-- **Authoritarian Drift**: Increasingly attacks democratic institutions when threatened
-- **Legacy Obsession**: Concerned with historical positioning and personal survival
-
-### **Decision-Making Patterns**
-- **Short-term Focus**: Prioritizes immediate political survival over long-term consequences
-- **Zero-Sum Thinking**: Views Palestinian rights as existential threat to Israeli security
-- **Divide and Conquer**: Exploits divisions within Palestinian leadership and international community
-
-## **⚖️ Intersectional Impact Analysis**
-
-### **On Palestinian Communities**
-- **Systematic Displacement**: Policies that accelerate land confiscation and home demolitions
-- **Economic Strangulation**: Blockade and restriction policies that limit Palestinian development
-- **Cultural Erasure**: Support for policies that deny Palestinian historical narrative
-- **Generational Trauma**: Perpetuation of cycles of violence and displacement
-
-### **On Israeli Society**
-- **Democratic Erosion**: Attacks on judiciary, press freedom, and civil society
-- **Social Polarization**: Deepening divisions between secular/religious, Ashkenazi/Mizrahi communities
-- **Militarization**: Normalization of violence and occupation mindset
-- **Economic Inequality**: Resources diverted to settlements and military while social services suffer
-
-### **On Regional Dynamics**
-- **Normalization Strategy**: Abraham Accords that bypass Palestinian rights
-- **Iranian Escalation**: Policies that increase regional tensions and proxy conflicts
-- **International Law Erosion**: Normalization of occupation and settlement expansion
-
-## **🔍 Multi-Modal Evidence Synthesis**
-
-### **Visual Communication Analysis**
-- **Body Language**: Projects confidence and control in public appearances
-- **Staging**: Carefully choreographed events that reinforce security messaging
-- **Symbolic Choices**: Use of religious and historical symbols to appeal to base
-
-### **Textual Analysis**
-- **Speech Patterns**: Repetitive use of existential threat language
-- **Historical References**: Selective use of Jewish history to justify current policies
-- **Legal Language**: Manipulation of legal frameworks to legitimize illegal actions
-
-### **Behavioral Patterns**
-- **Crisis Response**: Escalates military action during domestic political crises
-- **International Engagement**: Performative diplomacy while continuing harmful policies
-- **Coalition Building**: Maintains power through increasingly extreme alliances
-
-## **🌍 Solidarity-Centered Assessment**
-
-### **Harm Analysis**
-Netanyahu's leadership has **systematically undermined** both Palestinian liberation and genuine Israeli security through:
-- Perpetuation of occupation and apartheid systems
-- Erosion of democratic institutions and rule of law
-- Escalation of regional conflicts and violence
-- Obstruction of peace processes and two-state solutions
-
-### **Resistance and Alternatives**
-**Palestinian and Israeli civil society** continue organizing for:
-- **Joint resistance** to occupation and authoritarianism
-- **Democratic alternatives** that center human rights
-- **Economic justice** that benefits all communities
-- **Truth and reconciliation** processes
-
-## **🎯 Conclusion**
-
-From an **MMR perspective**, Netanyahu represents a **convergence of authoritarianism, settler colonialism, and militarism** that harms both Palestinian and Israeli communities while serving narrow political and economic interests.
-
-**True security and liberation** require leadership that prioritizes **human rights, democratic governance, and justice** over political survival and territorial expansion."""
-
-    # Al Ahli Hospital MMR Analysis
-    elif 'al ahli' in prompt_lower or 'hospital' in prompt_lower:
-        return """# **Multi-Modal Reasoning Analysis: Al-Ahli Hospital Incident**
-
-## **📊 Information Warfare Analysis**
-
-### **Competing Narratives**
-- **Palestinian Sources**: Israeli airstrike on hospital compound
-- **Israeli Sources**: Failed rocket launch by Palestinian Islamic Jihad
-- **US Intelligence**: Supports Israeli account based on intercepted communications
-- **Independent Analysts**: Mixed assessments based on available evidence
-
-### **Evidence Evaluation Framework**
-
-#### **Physical Evidence**
-- **Crater Analysis**: Size and pattern inconsistent with typical Israeli munitions
-- **Damage Assessment**: Parking lot explosion, hospital building largely intact
-- **Casualty Patterns**: High initial estimates later revised downward
-- **Debris Analysis**: Limited independent forensic investigation
-
-#### **Digital Evidence**
-- **Audio Intercepts**: US/Israeli claims of intercepted Hamas communications
-- **Video Footage**: Multiple angles showing explosion timing and location
-- **Social Media**: Rapid spread of unverified claims and counter-claims
-- **Satellite Imagery**: Pre/post incident analysis of damage patterns
-
-## **🎭 Narrative Construction Analysis**
-
-### **Information Ecosystem Dynamics**
-- **Speed vs. Accuracy**: Pressure for immediate attribution in 24/7 news cycle
-- **Confirmation Bias**: Audiences seeking information that confirms existing beliefs
-- **Source Credibility**: All parties have incentives to shape narrative
-- **Independent Verification**: Limited access for neutral investigators
-
-### **Propaganda Techniques**
-- **Emotional Appeals**: Focus on civilian casualties to generate outrage
-- **Technical Authority**: Use of intelligence claims to establish credibility
-- **Historical Precedent**: References to past incidents to support current claims
-- **Deflection Strategies**: Shifting focus from broader conflict patterns
-
-## **⚖️ Intersectional Impact Analysis**
-
-### **On Palestinian Communities**
-- **Medical Access**: Disruption of healthcare during humanitarian crisis
-- **Psychological Trauma**: Fear and uncertainty about civilian protection
-- **Information Isolation**: Limited ability to verify claims independently
-- **International Solidarity**: Global attention to civilian suffering
-
-### **On Israeli Society**
-- **Security Anxiety**: Reinforcement of existential threat narratives
-- **Moral Injury**: Confrontation with civilian casualty claims
-- **Information Bubbles**: Exposure primarily to state-approved narratives
-- **Democratic Accountability**: Limited public debate about military actions
-
-### **On Global Discourse**
-- **Polarization**: Incident used to reinforce existing political positions
-- **Media Responsibility**: Questions about verification standards and bias
-- **International Law**: Debates about civilian protection and war crimes
-- **Solidarity Movements**: Impact on organizing and public opinion
-
-## **🔍 Multi-Modal Evidence Synthesis**
-
-### **Visual Analysis**
-- **Explosion Footage**: Timing, location, and blast characteristics
-- **Damage Photography**: Extent and pattern of destruction
-- **Casualty Images**: Verification challenges and ethical considerations
-- **Contextual Imagery**: Broader documentation of conflict impacts
-
-### **Audio Analysis**
-- **Intercepted Communications**: Claims and counter-claims about authenticity
-- **Witness Testimony**: First-hand accounts from medical staff and civilians
-- **Official Statements**: Government and military spokesperson claims
-- **Expert Commentary**: Technical analysis from weapons and intelligence experts
-
-### **Textual Analysis**
-- **Official Reports**: Government and military investigation findings
-- **Media Coverage**: Framing and emphasis across different outlets
-- **Social Media**: Viral claims and fact-checking efforts
-- **Academic Analysis**: Scholarly examination of evidence and methodology
-
-## **🌍 Solidarity-Centered Assessment**
-
-### **Harm Reduction Focus**
-Regardless of attribution, the incident highlights:
-- **Civilian Vulnerability**: All parties must prioritize civilian protection
-- **Information Integrity**: Need for independent investigation and verification
-- **Systemic Violence**: Individual incidents occur within broader patterns of harm
-- **Accountability Gaps**: Limited mechanisms for investigating war crimes
-
-### **Justice Framework**
-**True accountability** requires:
-- **Independent Investigation** by neutral international bodies
-- **Civilian Protection** as highest priority for all parties
-- **Information Transparency** and access for journalists and investigators
-- **Systemic Change** addressing root causes of conflict
-
-## **🎯 Conclusion**
-
-From an **MMR perspective**, the Al-Ahli incident demonstrates how **information warfare** becomes central to modern conflicts, with **civilian suffering** instrumentalized for political and military objectives.
-
-**Solidarity demands** focusing on **civilian protection, independent investigation, and systemic change** rather than getting trapped in competing propaganda narratives."""
-
-    # Default MMR Analysis for other topics
+    return render_mmr_analysis(resolve_mmr_topic(prompt))
+
+def iter_mmr_analysis(prompt):
+    """
+    The analysis for a prompt one "## " section at a time. Routing and each
+    section run only when the next section is asked for, so a stream sends
+    its first frame before the rest of the analysis exists
+    """
+    kind, value = resolve_mmr_topic(prompt)
+    if kind == 'topic':
+        yield from iter_sections(TOPICS_BY_NAME[value]['analysis'])
     else:
-        # Extract key terms for analysis
-        key_terms = re.findall(r'\b\w+\b', prompt_lower)
-        topic = ' '.join(key_terms[:3])  # First 3 words as topic
-        
-        return f"""# **Multi-Modal Reasoning Analysis: {topic.title()}**
+        yield from default_mmr_sections(value)
+
+def default_mmr_sections(topic):
+    """Default MMR Analysis for other topics, one "## " section at a time"""
+    yield f"""# **Multi-Modal Reasoning Analysis: {topic.title()}**
 
-## **🧠 Analytical Framework Application**
+"""
+    yield """## **🧠 Analytical Framework Application**
 
 ### **Multi-Perspective Examination**
 This topic requires analysis through multiple lenses:
@@ -234,7 +184,8 @@ This topic requires analysis through multiple lenses:
 **Behavioral Patterns**: Actions, policies, and their real-world impacts
 **Contextual Factors**: Economic, political, and social environment
 
-## **⚖️ Justice-Centered Analysis**
+"""
+    yield """## **⚖️ Justice-Centered Analysis**
 
 ### **Harm Assessment**
 - Who is most affected by this issue?
@@ -248,7 +199,8 @@ This topic requires analysis through multiple lenses:
 - What role can solidarity play in creating change?
 - What are the pathways for systemic transformation?
 
-## **🌍 Intersectional Connections**
+"""
+    yield """## **🌍 Intersectional Connections**
 
 This issue connects to broader patterns of:
 - **Economic Justice**: Resource distribution and access
@@ -256,7 +208,8 @@ This issue connects to broader patterns of:
 - **Cultural Recognition**: Whose narratives are centered
 - **Environmental Impact**: Sustainability and community health
 
-## **🎯 Solidarity Recommendations**
+"""
+    yield """## **🎯 Solidarity Recommendations**
 
 **Immediate Actions**:
 - Center voices of those most affected
@@ -272,39 +225,169 @@ This issue connects to broader patterns of:
 
 *This analysis applies MMR principles to examine multiple dimensions of the issue while maintaining focus on justice and liberation.*"""
 
-@app.route('/api/mmr/query', methods=['POST'])
+def default_mmr_analysis(topic):
+    """Default MMR Analysis for other topics"""
+    return ''.join(default_mmr_sections(topic))
+
+def cached_mmr_response(key):
+    """The cached encoded response for a key from resolve_mmr_topic"""
+    return response_cache.get(key, encode_mmr_response, static=key[0] == 'topic')
+
+def request_prompt():
+    """
+    The prompt of a GET ?prompt= or a POST {"prompt": ...} request; None
+    when a POST body is not a JSON object or its prompt is not a string
+    """
+    if request.method != 'POST':
+        return request.args.get('prompt', '')
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None
+    prompt = data.get('prompt', '')
+    return prompt if isinstance(prompt, str) else None
+
+def invalid_prompt(prompt):
+    """The 400 response for a missing or malformed prompt, or None"""
+    if prompt is None:
+        return jsonify({'error': 'Body must be a JSON object with a string prompt'}), 400
+    if not prompt:
+        return jsonify({'error': 'Prompt is required'}), 400
+    return None
+
+def mmr_query_entry(prompt):
+    """The cached response for a prompt, routing it first"""
+    with metrics.stage('mmr_query.route'):
+        key = resolve_mmr_topic(prompt)
+    with metrics.stage('mmr_query.encode'):
+        return cached_mmr_response(key)
+
+def encode_mmr_response(key):
+    """
+    Serialize the /api/mmr/query body for a resolved topic, with the
+    content minus its timestamp as the ETag validator
+    """
+    content = {
+        'response': render_mmr_analysis(key),
+        'model': 'MMR-Analysis-v3.0',
+        'analysis_type': 'multi_modal_reasoning'
+    }
+    body = app.json.dumps({
+        'response': content['response'],
+        'timestamp': time.time(),
+        'model': content['model'],
+        'analysis_type': content['analysis_type']
+    }).encode() + b'\n'
+    return body, app.json.dumps(content).encode()
+
+@app.route('/api/mmr/query', methods=['GET', 'POST'])
 def mmr_query():
     """
     Multi-Modal Reasoning Query Endpoint
+
+    GET with ?prompt= is the cacheable form: a matching If-None-Match gets
+    a 304 there, while POST never does.
     """
     try:
-        data = request.get_json()
-        prompt = data.get('prompt', '')
-        
-        if not prompt:
-            return jsonify({'error': 'Prompt is required'}), 400
-        
-        # Perform actual MMR analysis
-        response = perform_mmr_analysis(prompt)
+        with metrics.stage('mmr_query.parse'):
+            prompt = request_prompt()
+
+        invalid = invalid_prompt(prompt)
+        if invalid is not None:
+            return invalid
         
-        return jsonify({
-            'response': response,
-            'timestamp': time.time(),
-            'model': 'MMR-Analysis-v3.0',
-            'analysis_type': 'multi_modal_reasoning'
-        })
+        # Perform actual MMR analysis, or reuse the encoded response for
+        # this topic; the timestamp records when the analysis was produced.
+        # Concurrent requests for the same prompt wait for the first one
+        entry = query_flights.do(prompt, mmr_query_entry, prompt)
+
+        with metrics.stage('mmr_query.respond'):
+            return entry.make_response(request)
         
     except Exception as e:
+        app.logger.exception('MMR query failed')
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/mmr/query/batch', methods=['POST'])
+def mmr_query_batch():
+    """
+    Batch Multi-Modal Reasoning Query Endpoint
+
+    Takes {"prompts": [...]} and streams one JSON line per prompt, in input
+    order, each the /api/mmr/query body plus its "index". Prompts resolving
+    to the same analysis are analyzed once; distinct analyses are built on
+    the batch thread pool.
+    """
+    data = request.get_json(silent=True)
+    prompts = data.get('prompts') if isinstance(data, dict) else None
+    if not isinstance(prompts, list) or not all(isinstance(p, str) and p for p in prompts):
+        return jsonify({'error': 'prompts must be an array of non-empty strings'}), 400
+    if len(prompts) > MAX_BATCH_PROMPTS:
+        return jsonify({'error': f'At most {MAX_BATCH_PROMPTS} prompts per batch'}), 413
+
+    with metrics.stage('mmr_query_batch.route'):
+        keys = {prompt: resolve_mmr_topic(prompt) for prompt in dict.fromkeys(prompts)}
+    futures = {key: batch_executor.submit(cached_mmr_response, key) for key in dict.fromkeys(keys.values())}
+
+    def generate():
+        for index, prompt in enumerate(prompts):
+            try:
+                body = futures[keys[prompt]].result().body
+            except Exception as e:
+                app.logger.exception('MMR batch query failed')
+                yield app.json.dumps({'index': index, 'error': str(e)}).encode() + b'\n'
+                continue
+            # Splice the index into the cached object instead of re-encoding it
+            yield b'{"index":%d,' % index + body[1:]
+
+    return app.response_class(generate(), mimetype='application/x-ndjson')
+
+@app.route('/api/mmr/query/stream', methods=['GET', 'POST'])
+def mmr_query_stream():
+    """
+    Streaming Multi-Modal Reasoning Query Endpoint
+
+    Sends the analysis one "## " section at a time, as Server-Sent Events by
+    default or as JSON lines with ?format=ndjson. GET with ?prompt= is
+    accepted for EventSource clients.
+    """
+    prompt = request_prompt()
+    invalid = invalid_prompt(prompt)
+    if invalid is not None:
+        return invalid
+
+    stream_format = request.args.get('format', 'sse')
+    if stream_format not in STREAM_FORMATS:
+        return jsonify({'error': f'format must be one of {", ".join(STREAM_FORMATS)}'}), 400
+    mimetype, encode = STREAM_FORMATS[stream_format]
+
+    meta = {
+        'timestamp': time.time(),
+        'model': 'MMR-Analysis-v3.0',
+        'analysis_type': 'multi_modal_reasoning'
+    }
+    sections = iter_mmr_analysis(prompt)
+
+    response = app.response_class(stream_with_context(stream_analysis(sections, meta, encode)), mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # let reverse proxies flush each frame
+    return response
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    health = {
         'status': 'healthy',
         'message': 'MMR Analysis API is running',
-        'timestamp': time.time()
-    })
+        'timestamp': time.time(),
+        'response_cache': response_cache.stats(),
+        'coalescing': query_flights.stats()
+    }
+    if rate_limiter.enabled:
+        health['rate_limit'] = rate_limiter.stats()
+    # Present when served through src/wsgi.py
+    if 'mmr_concurrency' in app.extensions:
+        health['concurrency'] = app.extensions['mmr_concurrency'].stats()
+    return jsonify(health)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=False)
@@ -0,0 +1,43 @@
+"""
+SQLite engine tuning for the Flask-SQLAlchemy `db`
+"""
+from sqlalchemy import event
+
+# Applied to every new pooled connection. WAL lets readers proceed while a
+# writer commits; NORMAL sync is durable across application crashes in WAL mode
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', 15000),
+    ('cache_size', -16000),  # KiB of page cache per connection
+    ('temp_store', 'MEMORY'),
+    ('foreign_keys', 'ON'),
+)
+
+
+def engine_options(pool_size=8):
+    """SQLALCHEMY_ENGINE_OPTIONS for a per-process pool of SQLite connections"""
+    return {
+        'pool_size': pool_size,
+        'max_overflow': pool_size,
+        'pool_timeout': 15,
+        'connect_args': {
+            # Pooled connections move between a worker's threads
+            'check_same_thread': False,
+            'timeout': 15,
+            # Prepared statements kept per connection, keyed by SQL text
+            'cached_statements': 256,
+        },
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS:
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+
+def install_sqlite_pragmas(engine):
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', _set_sqlite_pragmas)
@@ -0,0 +1,64 @@
+import hmac
+
+from flask import Blueprint, current_app, jsonify, request
+
+metrics_bp = Blueprint('metrics', __name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _metrics():
+    return current_app.extensions['mmr_metrics']
+
+
+def _disabled():
+    return jsonify({'error': 'Metrics are disabled; start the API with MMR_METRICS=1'}), 404
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Per-route and per-stage metrics in Prometheus text format"""
+    metrics = _metrics()
+    if not metrics.enabled:
+        return _disabled()
+    return metrics.render(), 200, {'Content-Type': PROMETHEUS_CONTENT_TYPE}
+
+
+@metrics_bp.route('/metrics/profiler', methods=['GET'])
+def get_profile():
+    """Folded stacks of the slowest requests, for flamegraph.pl or speedscope"""
+    metrics = _metrics()
+    if not metrics.enabled:
+        return _disabled()
+    return metrics.dump_profiles(), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+
+
+@metrics_bp.route('/metrics/profiler', methods=['POST'])
+def toggle_profiler():
+    """
+    Turn the sampling profiler on or off in every worker sharing
+    MMR_METRICS_DIR: {"enabled": true, "slowest": 10}. Needs
+    `Authorization: Bearer <MMR_METRICS_TOKEN>`.
+    """
+    metrics = _metrics()
+    if not metrics.enabled:
+        return _disabled()
+    if metrics.token is None:
+        return jsonify({'error': 'Switching the profiler is disabled; set MMR_METRICS_TOKEN'}), 403
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(supplied.encode(), metrics.token.encode()):
+        return jsonify({'error': 'Invalid or missing bearer token'}), 401
+
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    if data.get('enabled'):
+        slowest = data.get('slowest', metrics.profiler.slowest or 10)
+        if not isinstance(slowest, int) or isinstance(slowest, bool) or slowest < 1:
+            return jsonify({'error': 'slowest must be a positive integer'}), 400
+        metrics.set_profiler(True, slowest)
+    else:
+        metrics.set_profiler(False)
+    return jsonify({'enabled': metrics.profiler.enabled, 'slowest': metrics.profiler.slowest})
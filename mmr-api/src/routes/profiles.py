@@ -0,0 +1,54 @@
+from flask import Blueprint, current_app, jsonify, request
+from src.services.profile_index import SORT_ORDERS
+
+profiles_bp = Blueprint('profiles', __name__)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+FILTERS = ('category', 'status', 'source', 'pillar', 'assessment', 'name')
+
+
+def _index():
+    return current_app.extensions['mmr_profile_index']
+
+
+@profiles_bp.route('/profiles', methods=['GET'])
+def list_profiles():
+    """
+    Filtered, score-sorted page of profiles.
+
+    Query parameters: category, status, source, pillar, assessment, name,
+    sort (high-to-low | low-to-high), limit and the cursor from the
+    previous page's next_cursor. People in both databases are listed once
+    unless `source` picks one.
+    """
+    sort = request.args.get('sort', 'high-to-low')
+    if sort not in SORT_ORDERS:
+        return jsonify({'error': f'sort must be one of {", ".join(SORT_ORDERS)}'}), 400
+
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        cursor = None if cursor in (None, '') else int(cursor)
+    except ValueError:
+        return jsonify({'error': 'limit and cursor must be integers'}), 400
+    if cursor is not None and cursor < 0:
+        return jsonify({'error': 'cursor must not be negative'}), 400
+
+    filters = {name: request.args[name] for name in FILTERS if name in request.args}
+    profiles, next_cursor = _index().query(sort=sort, cursor=cursor, limit=limit, **filters)
+
+    return jsonify({
+        'profiles': profiles,
+        'count': len(profiles),
+        'next_cursor': None if next_cursor is None else str(next_cursor)
+    })
+
+
+@profiles_bp.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    profile = _index().get(profile_id)
+    if profile is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return jsonify(profile)
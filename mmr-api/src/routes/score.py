@@ -0,0 +1,59 @@
+from flask import Blueprint, current_app, jsonify, request
+from src.services.scoring import map_outcome_to_category
+
+score_bp = Blueprint('score', __name__)
+
+# Upper bound on profiles accepted by one batch call
+MAX_BATCH_PROFILES = 10000
+
+
+def _scorer():
+    return current_app.extensions['mmr_scorer']
+
+
+def _optional_str(value):
+    return value is None or isinstance(value, str)
+
+
+def _valid_profile(profile):
+    """A dict whose pillars are dicts with str (or missing) pillar/assessment, and a str reflection if any"""
+    if not isinstance(profile, dict) or not isinstance(profile.get('pillars'), list):
+        return False
+    return _optional_str(profile.get('reflection')) and all(
+        isinstance(p, dict) and _optional_str(p.get('pillar')) and _optional_str(p.get('assessment'))
+        for p in profile['pillars']
+    )
+
+
+@score_bp.route('/mmr/score', methods=['POST'])
+def score_profile():
+    """Score one profile: {"pillars": [{"pillar", "assessment"}], "reflection"}"""
+    profile = request.get_json(silent=True)
+    if not _valid_profile(profile):
+        return jsonify({'error': 'A profile with a pillars array is required'}), 400
+
+    outcome = _scorer().score(profile)
+    return jsonify({
+        'outcome': outcome,
+        'category': map_outcome_to_category(outcome)
+    })
+
+
+@score_bp.route('/mmr/score/batch', methods=['POST'])
+def score_batch():
+    """Score many profiles in one call: {"profiles": [...]}"""
+    data = request.get_json(silent=True)
+    profiles = data.get('profiles') if isinstance(data, dict) else None
+    if not isinstance(profiles, list) or not all(_valid_profile(p) for p in profiles):
+        return jsonify({'error': 'profiles must be an array of profiles with pillars arrays'}), 400
+    if len(profiles) > MAX_BATCH_PROFILES:
+        return jsonify({'error': f'At most {MAX_BATCH_PROFILES} profiles per batch'}), 413
+
+    outcomes = _scorer().score_batch(profiles)
+    return jsonify({
+        'outcomes': [
+            {'outcome': outcome, 'category': map_outcome_to_category(outcome)}
+            for outcome in outcomes
+        ],
+        'count': len(outcomes)
+    })
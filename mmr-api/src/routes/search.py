@@ -0,0 +1,42 @@
+from flask import Blueprint, current_app, jsonify, request
+from src.services.search_index import SEARCH_FIELDS
+
+search_bp = Blueprint('search', __name__)
+
+DEFAULT_RESULTS = 10
+MAX_RESULTS = 50
+
+FILTERS = ('pillar', 'assessment', 'field', 'source')
+
+
+def _index():
+    return current_app.extensions['mmr_search_index']
+
+
+@search_bp.route('/search', methods=['GET'])
+def search():
+    """
+    BM25-ranked profiles whose evidence, source_context or reflection match q.
+
+    Query parameters: q, pillar, assessment, field, source and limit.
+    Snippets are HTML-escaped with matches wrapped in <mark>.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+    if request.args.get('field', SEARCH_FIELDS[0]) not in SEARCH_FIELDS:
+        return jsonify({'error': f'field must be one of {", ".join(SEARCH_FIELDS)}'}), 400
+
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_RESULTS)), 1), MAX_RESULTS)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    filters = {name: request.args[name] for name in FILTERS if name in request.args}
+    results = _index().search(query, limit=limit, **filters)
+
+    return jsonify({
+        'query': query,
+        'results': results,
+        'count': len(results)
+    })
@@ -0,0 +1,23 @@
+from flask import Blueprint, current_app, jsonify
+
+stats_bp = Blueprint('stats', __name__)
+
+
+def _rollups():
+    return current_app.extensions['mmr_rollups']
+
+
+@stats_bp.route('/stats', methods=['GET'])
+def get_stats():
+    """Overall and per-category pass/partial/fail counts"""
+    return jsonify(_rollups().snapshot())
+
+
+@stats_bp.route('/stats/consistency', methods=['GET'])
+def check_consistency():
+    """Compare the incremental tallies against a full recompute"""
+    mismatches = _rollups().verify()
+    return jsonify({
+        'consistent': not mismatches,
+        'mismatched_scopes': mismatches
+    }), 200 if not mismatches else 500
@@ -1,22 +1,93 @@
-from flask import Blueprint, jsonify, request
+import hmac
+
+from flask import Blueprint, current_app, jsonify, request, url_for
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.exc import IntegrityError
 from src.models.user import User, db
 
 user_bp = Blueprint('user', __name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+
+# Built once so every request sends identical SQL text and reuses the
+# connection's prepared statement
+PAGE_QUERY = select(User).where(User.id > bindparam('after_id')).order_by(User.id).limit(bindparam('limit'))
+BY_USERNAME_QUERY = select(User).where(User.username == bindparam('username'))
+BY_EMAIL_QUERY = select(User).where(User.email == bindparam('email'))
+
+@user_bp.before_request
+def require_token():
+    # Every route here reads or writes personal data: only callers holding
+    # MMR_USERS_TOKEN get in, and without one configured nobody does
+    token = current_app.config.get('MMR_USERS_TOKEN')
+    if not token:
+        return jsonify({'error': 'The users API is disabled; set MMR_USERS_TOKEN'}), 403
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(supplied.encode(), token.encode()):
+        return jsonify({'error': 'Invalid or missing bearer token'}), 401
+    return None
+
 @user_bp.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    # Exact lookups go through the unique indexes on username and email
+    if 'username' in request.args:
+        users = db.session.scalars(BY_USERNAME_QUERY, {'username': request.args['username']}).all()
+        return jsonify([user.to_dict() for user in users])
+    if 'email' in request.args:
+        users = db.session.scalars(BY_EMAIL_QUERY, {'email': request.args['email']}).all()
+        return jsonify([user.to_dict() for user in users])
+
+    # Keyset pagination: ?after=<last id seen>&limit=N, next page in the Link header
+    try:
+        after_id = int(request.args.get('after', 0))
+        limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'after and limit must be integers'}), 400
+
+    users = db.session.scalars(PAGE_QUERY, {'after_id': after_id, 'limit': limit}).all()
+    response = jsonify([user.to_dict() for user in users])
+    if len(users) == limit:
+        next_url = url_for('user.get_users', after=users[-1].id, limit=limit)
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
-    
-    data = request.json
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('username'), str) or not isinstance(data.get('email'), str):
+        return jsonify({'error': 'A username and an email are required'}), 400
     user = User(username=data['username'], email=data['email'])
     db.session.add(user)
     db.session.commit()
     return jsonify(user.to_dict()), 201
 
+@user_bp.route('/users/batch', methods=['POST'])
+def create_users_batch():
+    """Insert many users in a single transaction; all or nothing"""
+    data = request.get_json(silent=True)
+    rows = data.get('users') if isinstance(data, dict) else data
+    if not isinstance(rows, list) or not rows:
+        return jsonify({'error': 'A non-empty array of users is required'}), 400
+    if len(rows) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'At most {MAX_BATCH_SIZE} users per batch'}), 413
+    if not all(isinstance(row, dict) and isinstance(row.get('username'), str) and isinstance(row.get('email'), str)
+               for row in rows):
+        return jsonify({'error': 'Every user needs a username and an email'}), 400
+
+    try:
+        users = db.session.scalars(
+            insert(User).returning(User),
+            [{'username': row['username'], 'email': row['email']} for row in rows]
+        ).all()
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Duplicate username or email; no users were created'}), 409
+
+    return jsonify({'created': len(users), 'users': [user.to_dict() for user in users]}), 201
+
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
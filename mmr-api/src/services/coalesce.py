@@ -0,0 +1,65 @@
+"""
+Single-flight coalescing of identical concurrent calls
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs `fn` once per key at a time.
+
+    A caller arriving while the same key is already being computed waits
+    for that computation and gets its result (or its exception) instead of
+    starting another. Nothing is kept once the call finishes; caching is
+    left to the caller.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.calls = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def do(self, key, fn, *args):
+        if not self.enabled:
+            return fn(*args)
+
+        with self._lock:
+            self.calls += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'shared': self.shared, 'in_flight': len(self._inflight)}
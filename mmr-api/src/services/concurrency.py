@@ -0,0 +1,103 @@
+"""
+Bounded concurrency with 503 load shedding, as WSGI middleware
+"""
+import json
+import threading
+
+
+class ConcurrencyLimiter:
+    """
+    Lets at most `max_concurrent` requests run at once per process.
+
+    Up to `max_queue` more wait for a slot, each for at most `queue_timeout`
+    seconds; anything beyond that is shed immediately with a 503 so an
+    overloaded worker fails fast instead of piling up latency. A slot is
+    held until the response body is fully sent, so streamed responses count
+    for as long as they stream.
+
+    Shed responses never reach Flask, so `allow_origin` gives them the CORS
+    headers the app would have added; browsers can then read the 503 and
+    its Retry-After instead of seeing an opaque network error.
+    """
+
+    def __init__(self, app, max_concurrent, max_queue, queue_timeout=1.0, retry_after=1, exempt_paths=(),
+                 allow_origin=None):
+        self.app = app
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.exempt_paths = frozenset(exempt_paths)
+        self.allow_origin = allow_origin
+        self.shed = 0
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') in self.exempt_paths:
+            return self.app(environ, start_response)
+
+        if not self._acquire():
+            with self._lock:
+                self.shed += 1
+            return self._overloaded(start_response)
+
+        try:
+            result = self.app(environ, start_response)
+        except BaseException:
+            self._slots.release()
+            raise
+        return _ReleasingIterable(result, self._slots.release)
+
+    def _acquire(self):
+        if self._slots.acquire(blocking=False):
+            return True
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                return False
+            self._waiting += 1
+        try:
+            return self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def _overloaded(self, start_response):
+        body = json.dumps({'error': 'Server is overloaded, please retry shortly'}).encode()
+        headers = [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body))),
+            ('Retry-After', str(self.retry_after)),
+        ]
+        if self.allow_origin is not None:
+            headers.append(('Access-Control-Allow-Origin', self.allow_origin))
+            headers.append(('Access-Control-Expose-Headers', 'Retry-After'))
+        start_response('503 Service Unavailable', headers)
+        return [body]
+
+    def stats(self):
+        with self._lock:
+            return {'waiting': self._waiting, 'shed': self.shed}
+
+
+class _ReleasingIterable:
+    """Response iterable that frees its slot when the server closes it"""
+
+    def __init__(self, iterable, release):
+        self._iterable = iterable
+        self._release = release
+        self._released = False
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+    def close(self):
+        try:
+            close = getattr(self._iterable, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
@@ -0,0 +1,385 @@
+"""
+Streaming ingestion of profile files into one canonical schema
+
+The two databases disagree on field names (subject / name, overall_alignment
+/ overall_rating), assessment spelling ("✅ Pass", "⚠️ Partial", "Pass") and
+pillar titles ("Humanize both peoples", "Humanize Both Peoples"). ingest()
+validates each profile once and resolves those strings to the Pillar,
+Assessment and Status enums, so downstream code compares singletons instead
+of renormalizing text.
+
+Files are read incrementally: .json files holding a bare array or a
+{"profiles": [...]} object, and .jsonl / .ndjson files with one profile per
+line. Only one profile is held in memory at a time, and malformed rows are
+recorded in an IngestReport instead of stopping the run.
+
+    python -m src.services.ingest FILE... [--output profiles.ndjson]
+"""
+import argparse
+import json
+import os
+import sys
+from enum import Enum
+from functools import lru_cache
+
+from src.services.profile_data import PROFILE_DATABASES
+from src.services.profile_index import clean_assessment, normalize_name, rating_status
+
+CHUNK_SIZE = 1 << 20
+
+# A .json value still incomplete after this much text is treated as a syntax
+# error rather than read on to the end of the file
+MAX_PROFILE_CHARS = 64 << 20
+
+# Characters that can continue a number: "2." or "2.5e" cut at a chunk
+# boundary decodes as a shorter number
+NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+
+class Pillar(str, Enum):
+    """The seven MMR pillars, by their titles in mmr_complete_database.json"""
+    REJECT_TARGETING_CIVILIANS = 'Reject Targeting of Civilians'
+    HAMAS_ACCOUNTABILITY = 'Accountability for Hamas / Militant Rejectionists'
+    ISRAELI_RIGHT_ACCOUNTABILITY = 'Accountability for Israeli Right / Ultra-Nationalists'
+    VERIFIED_SOURCES = 'Use Verified, Truthful Sources'
+    HUMANIZE_BOTH_PEOPLES = 'Humanize Both Peoples'
+    REJECT_ELIMINATIONISM = 'Reject Eliminationism'
+    VISION_FOR_PEACE = 'Vision for Dignity & Peace'
+
+
+class Status(str, Enum):
+    PASS = 'Pass'
+    PARTIAL = 'Partial'
+    FAIL = 'Fail'
+
+
+class Assessment(str, Enum):
+    STRONG_PASS = 'Strong Pass'
+    PASS = 'Pass'
+    PARTIAL = 'Partial'
+    MIXED = 'Mixed'
+    MODERATE = 'Moderate'
+    WEAK = 'Weak'
+    FAIL = 'Fail'
+    CLEAR_FAIL = 'Clear Fail'
+
+    @property
+    def status(self):
+        return ASSESSMENT_STATUS[self]
+
+
+ASSESSMENT_STATUS = {
+    Assessment.STRONG_PASS: Status.PASS,
+    Assessment.PASS: Status.PASS,
+    Assessment.PARTIAL: Status.PARTIAL,
+    Assessment.MIXED: Status.PARTIAL,
+    Assessment.MODERATE: Status.PARTIAL,
+    Assessment.WEAK: Status.PARTIAL,
+    Assessment.FAIL: Status.FAIL,
+    Assessment.CLEAR_FAIL: Status.FAIL,
+}
+
+# Pillar titles used by either database, by normalize_name key
+PILLAR_ALIASES = {normalize_name(pillar.value): pillar for pillar in Pillar}
+PILLAR_ALIASES.update({
+    normalize_name('Reject targeting of civilians'): Pillar.REJECT_TARGETING_CIVILIANS,
+    normalize_name('Accountability for Hamas / PA rejectionism'): Pillar.HAMAS_ACCOUNTABILITY,
+    normalize_name('Accountability for Israeli Far-Right / State-Caused Harm'): Pillar.ISRAELI_RIGHT_ACCOUNTABILITY,
+    normalize_name('Verified, truthful sources'): Pillar.VERIFIED_SOURCES,
+    normalize_name('Vision for Dignity, Coexistence & Peace'): Pillar.VISION_FOR_PEACE,
+})
+
+# Assessments by clean_assessment text ("✅ Strong" -> "strong")
+ASSESSMENT_ALIASES = {assessment.value.lower(): assessment for assessment in Assessment}
+ASSESSMENT_ALIASES.update({
+    'strong': Assessment.STRONG_PASS,
+    'strong fail': Assessment.CLEAR_FAIL,
+})
+
+# Optional free-text fields, canonical name -> database field
+TEXT_FIELDS = {
+    'role': 'role',
+    'affiliation': 'affiliation',
+    'category': 'category',
+    'source_context': 'source_context',
+    'reflection': 'reflection',
+    'conclusion': 'full_conclusion',
+}
+LIST_FIELDS = ('strengths', 'weaknesses')
+
+
+class MalformedProfile(ValueError):
+    """A profile that cannot be brought into the canonical schema"""
+
+
+class IngestReport:
+    """Per-file counts and the first `max_errors` malformed rows"""
+
+    def __init__(self, max_errors=1000):
+        self.max_errors = max_errors
+        self.files = {}
+        self.errors = []
+
+    def record(self, path, ok=True, index=None, reason=None):
+        counts = self.files.setdefault(path, {'read': 0, 'ingested': 0, 'malformed': 0})
+        counts['read'] += 1
+        if ok:
+            counts['ingested'] += 1
+            return
+        counts['malformed'] += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'file': path, 'index': index, 'error': reason})
+
+    @property
+    def malformed(self):
+        return sum(counts['malformed'] for counts in self.files.values())
+
+    def summary(self):
+        return {'files': self.files, 'malformed': self.malformed, 'errors': self.errors}
+
+
+def source_name(path):
+    """Source for a file: the PROFILE_DATABASES name of a known database, else its stem"""
+    filename = os.path.basename(path)
+    for source, database in PROFILE_DATABASES.items():
+        if filename == database:
+            return source
+    return os.path.splitext(filename)[0]
+
+
+@lru_cache(maxsize=1024)
+def parse_assessment(text):
+    """Assessment for any spelling in either database, or None"""
+    return ASSESSMENT_ALIASES.get(clean_assessment(text))
+
+
+def normalize_profile(raw, source):
+    """Canonical form of one raw profile; raises MalformedProfile"""
+    if not isinstance(raw, dict):
+        raise MalformedProfile(f'expected an object, got {type(raw).__name__}')
+
+    name = raw.get('name') or raw.get('subject')
+    if not isinstance(name, str) or not name.strip():
+        raise MalformedProfile('missing name/subject')
+
+    overall = raw.get('overall_rating') or raw.get('overall_alignment')
+    if not isinstance(overall, str) or not clean_assessment(overall):
+        raise MalformedProfile('missing overall_rating/overall_alignment')
+    status = rating_status(overall)
+    if status is None:
+        raise MalformedProfile(f'unknown overall rating {overall!r}')
+
+    profile = {'source': source, 'name': name.strip(), 'overall': Status(status)}
+    for field, key in TEXT_FIELDS.items():
+        value = raw.get(key)
+        if value is not None and not isinstance(value, str):
+            raise MalformedProfile(f'{key} must be a string')
+        profile[field] = sys.intern(value) if field == 'category' and value else value
+    for field in LIST_FIELDS:
+        value = raw.get(field) or []
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise MalformedProfile(f'{field} must be an array of strings')
+        profile[field] = value
+
+    pillars = raw.get('pillars')
+    if not isinstance(pillars, list) or not pillars:
+        raise MalformedProfile('pillars must be a non-empty array')
+    profile['pillars'] = []
+    seen = set()
+    for n, entry in enumerate(pillars):
+        if not isinstance(entry, dict):
+            raise MalformedProfile(f'pillar {n} is not an object')
+        pillar = entry.get('pillar')
+        pillar = PILLAR_ALIASES.get(normalize_name(pillar)) if isinstance(pillar, str) else None
+        if pillar is None:
+            raise MalformedProfile(f'pillar {n}: unknown pillar {entry.get("pillar")!r}')
+        if pillar in seen:
+            raise MalformedProfile(f'pillar {n}: duplicate {pillar.value!r}')
+        seen.add(pillar)
+        assessment = entry.get('assessment')
+        assessment = parse_assessment(assessment) if isinstance(assessment, str) else None
+        if assessment is None:
+            raise MalformedProfile(f'pillar {n}: unknown assessment {entry.get("assessment")!r}')
+        evidence = entry.get('evidence')
+        if evidence is not None and not isinstance(evidence, str):
+            raise MalformedProfile(f'pillar {n}: evidence must be a string')
+        profile['pillars'].append({'pillar': pillar, 'assessment': assessment, 'evidence': evidence})
+    return profile
+
+
+def to_database_row(profile):
+    """A canonical profile in the mmr_complete_database.json layout"""
+    row = {
+        'name': profile['name'],
+        'overall_rating': profile['overall'].value,
+        'pillars': [
+            {'pillar': p['pillar'].value, 'assessment': p['assessment'].value, 'evidence': p['evidence']}
+            for p in profile['pillars']
+        ],
+    }
+    for field, key in TEXT_FIELDS.items():
+        if profile[field] is not None:
+            row[key] = profile[field]
+    for field in LIST_FIELDS:
+        if profile[field]:
+            row[field] = profile[field]
+    return row
+
+
+class _Buffer:
+    """Text read from a file in chunks, with a read position"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.pos > len(self.text) // 2:
+            self.text, self.pos = self.text[self.pos:], 0
+        chunk = self.f.read(self.chunk_size)
+        self.eof = not chunk
+        self.text += chunk
+        return not self.eof
+
+    def peek(self):
+        """Next non-whitespace character, or '' at the end of the file"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f'Expecting {char!r}', self.text, self.pos)
+        self.pos += 1
+
+    def decode(self, decoder):
+        """The next JSON value; a value running into the end of the buffer is re-read with more text"""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or len(self.text) - self.pos > MAX_PROFILE_CHARS or not self.fill():
+                    raise
+                continue
+            if not self.eof and self._may_continue(value, end) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def _may_continue(self, value, end):
+        """Whether more text could still extend the value decoded up to `end`"""
+        if end == len(self.text):
+            return True
+        number = isinstance(value, (int, float)) and not isinstance(value, bool)
+        return number and self.text[end] in NUMBER_CHARS and len(self.text) - self.pos <= MAX_PROFILE_CHARS
+
+
+def iter_json_profiles(f, chunk_size=CHUNK_SIZE):
+    """Profiles of a bare JSON array or of the "profiles" array of an object, one at a time"""
+    decoder = json.JSONDecoder()
+    buffer = _Buffer(f, chunk_size)
+    if buffer.peek() == '{':
+        buffer.pos += 1
+        while True:
+            if buffer.peek() == '}':
+                return
+            key = buffer.decode(decoder)
+            buffer.expect(':')
+            if key == 'profiles':
+                break
+            buffer.decode(decoder)
+            if buffer.peek() == ',':
+                buffer.pos += 1
+
+    buffer.expect('[')
+    if buffer.peek() == ']':
+        return
+    while True:
+        yield buffer.decode(decoder)
+        if buffer.peek() == ']':
+            return
+        buffer.expect(',')
+
+
+def iter_raw_profiles(path):
+    """
+    (index, raw profile or JSONDecodeError) pairs of one file.
+
+    A bad line of a JSON-lines file is reported and skipped; a syntax error
+    in a .json file ends that file, as nothing after it can be trusted.
+    """
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson')):
+            for index, line in enumerate(f):
+                if not line.strip():
+                    continue
+                try:
+                    yield index, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield index, e
+            return
+
+        index = 0
+        profiles = iter_json_profiles(f)
+        while True:
+            try:
+                raw = next(profiles)
+            except StopIteration:
+                return
+            except json.JSONDecodeError as e:
+                yield index, e
+                return
+            yield index, raw
+            index += 1
+
+
+def ingest(paths, report=None):
+    """Canonical profiles from every file in `paths`, in order; problems go to `report`"""
+    if report is None:
+        report = IngestReport()
+    for path in paths:
+        source = source_name(path)
+        for index, raw in iter_raw_profiles(path):
+            if isinstance(raw, json.JSONDecodeError):
+                report.record(path, ok=False, index=index, reason=f'invalid JSON: {raw}')
+                continue
+            try:
+                profile = normalize_profile(raw, source)
+            except MalformedProfile as e:
+                report.record(path, ok=False, index=index, reason=str(e))
+                continue
+            report.record(path)
+            yield profile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Validate and normalize profile files into one schema')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--output', help='write canonical profiles here as JSON lines')
+    args = parser.parse_args(argv)
+
+    report = IngestReport()
+    out = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        for profile in ingest(args.paths, report):
+            if out is not None:
+                out.write(json.dumps(to_database_row(profile), ensure_ascii=False) + '\n')
+    finally:
+        if out is not None:
+            out.close()
+
+    json.dump(report.summary(), sys.stderr, indent=2, ensure_ascii=False)
+    sys.stderr.write('\n')
+    return 1 if report.malformed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,490 @@
+"""
+Opt-in request metrics (Prometheus text format) and a slow-request profiler
+
+Nothing is hooked into the app unless metrics are enabled, so the only cost
+when disabled is the no-op `stage()` context in instrumented handlers.
+
+Under gunicorn each scrape reaches one worker. With a shared directory
+(MMR_METRICS_DIR) every worker writes its series there once per
+`flush_interval`, and whichever worker serves the scrape merges all of
+them, so the numbers cover the whole server. When a worker exits, its file
+is folded into one file of exited workers' totals (fold_exited_worker(),
+from gunicorn's child_exit hook), so the directory holds one file per live
+worker and counters never go backwards. Empty the directory when the server
+starts (gunicorn.conf.py does).
+"""
+import glob
+import heapq
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import nullcontext
+
+from flask import g, request
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Histogram series: name -> buckets
+HISTOGRAMS = {
+    'latency': LATENCY_BUCKETS,
+    'stages': LATENCY_BUCKETS,
+    'request_bytes': SIZE_BUCKETS,
+    'response_bytes': SIZE_BUCKETS,
+}
+COUNTERS = ('requests', 'errors')
+
+# Runtime profiler setting shared by every worker, in the metrics directory
+PROFILER_CONTROL = 'profiler.json'
+
+# Totals of exited workers, and the worker files already added to them
+EXITED_STATE = 'exited.json'
+
+# Slowest profiles kept from exited workers
+EXITED_PROFILES = 100
+
+_NOOP = nullcontext()
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a sum and a count"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        for i, n in enumerate(counts):
+            self.counts[i] += n
+        self.sum += total
+        self.count += count
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(labels + (("le", str(bound)),))} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {self.sum}')
+        lines.append(f'{name}_count{_labels(labels)} {self.count}')
+        return lines
+
+
+class Metrics:
+    """
+    Per-route latency, payload size and error metrics plus per-stage latency
+    """
+
+    def __init__(self, enabled=False, profile_slowest=0, directory=None, flush_interval=1.0, token=None,
+                 worker_id=None):
+        self.enabled = enabled
+        self.profiler = SlowRequestProfiler(profile_slowest)
+        self.directory = directory
+        self.flush_interval = flush_interval
+        # Required as a bearer token by POST /api/metrics/profiler; unset disables it
+        self.token = token
+        self.worker_id = worker_id
+        self._lock = threading.Lock()
+        self._histograms = {name: {} for name in HISTOGRAMS}
+        self._counters = {name: Counter() for name in COUNTERS}
+        self._flusher_pid = None
+        self._flush_lock = threading.Lock()
+        self._state_name = None
+        self._state_name_pid = None
+        self._control = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        MMR_METRICS=1 enables metrics; MMR_PROFILE_SLOWEST=N also profiles
+        the N slowest requests; MMR_METRICS_DIR shares them between workers;
+        MMR_METRICS_TOKEN allows switching the profiler at runtime
+        """
+        return cls(
+            enabled=os.environ.get('MMR_METRICS') == '1',
+            profile_slowest=int(os.environ.get('MMR_PROFILE_SLOWEST', 0)),
+            directory=os.environ.get('MMR_METRICS_DIR') or None,
+            token=os.environ.get('MMR_METRICS_TOKEN') or None,
+        )
+
+    def init_app(self, app):
+        app.extensions['mmr_metrics'] = self
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        self.profiler.start()
+
+    def stage(self, name):
+        """Context manager timing one stage of a handler"""
+        if not self.enabled:
+            return _NOOP
+        return _Stage(self, name)
+
+    def observe_stage(self, name, seconds):
+        with self._lock:
+            _histogram(self._histograms['stages'], name, LATENCY_BUCKETS).observe(seconds)
+
+    def _before_request(self):
+        # The flusher thread is started per process, on its first request,
+        # like the profiler's sampler
+        if self.directory is not None and self._flusher_pid != os.getpid():
+            self._spawn_flusher()
+        g.metrics_start = time.perf_counter()
+        self.profiler.begin()
+
+    def _after_request(self, response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        seconds = time.perf_counter() - start
+        route = _route()
+        key = (('route', route), ('method', request.method))
+
+        # Streamed bodies have no length up front and are left out
+        response_size = None if response.is_streamed else response.calculate_content_length()
+        histograms = self._histograms
+        with self._lock:
+            _histogram(histograms['latency'], key, LATENCY_BUCKETS).observe(seconds)
+            if request.content_length is not None:
+                _histogram(histograms['request_bytes'], key, SIZE_BUCKETS).observe(request.content_length)
+            if response_size is not None:
+                _histogram(histograms['response_bytes'], key, SIZE_BUCKETS).observe(response_size)
+            self._counters['requests'][key + (('status', str(response.status_code)),)] += 1
+            if response.status_code >= 500:
+                self._counters['errors'][key] += 1
+
+        # Labelled by route pattern: query strings may hold emails or prompts
+        self.profiler.end(f'{request.method} {route} {response.status_code}', seconds)
+        return response
+
+    def _teardown_request(self, exc):
+        # Reached without _after_request only when the request died unhandled
+        if g.pop('metrics_start', None) is not None:
+            with self._lock:
+                self._counters['errors'][(('route', _route()), ('method', request.method))] += 1
+            self.profiler.end(None, 0)
+
+    # Sharing between workers
+
+    def _state_path(self):
+        # Named by pid and start time, so a later worker reusing the pid
+        # never overwrites an exited worker's file before it is folded
+        if self.worker_id is not None:
+            return os.path.join(self.directory, f'worker-{self.worker_id}.json')
+        if self._state_name_pid != os.getpid():
+            self._state_name_pid = os.getpid()
+            self._state_name = f'worker-{os.getpid()}-{time.time_ns()}.json'
+        return os.path.join(self.directory, self._state_name)
+
+    def state(self):
+        """This process's series and kept profiles, as JSON-serializable lists"""
+        with self._lock:
+            return _state(self._histograms, self._counters, self.profiler.state())
+
+    def flush(self):
+        """Write this process's state to the shared directory"""
+        with self._flush_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            _write_json(self._state_path(), self.state())
+
+    def _spawn_flusher(self):
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        os.makedirs(self.directory, exist_ok=True)
+        threading.Thread(target=self._flush_loop, name='mmr-metrics', daemon=True).start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._flusher_pid == pid:
+            time.sleep(self.flush_interval)
+            self.apply_profiler_control()
+            self.flush()
+
+    def set_profiler(self, enabled, slowest=None):
+        """Switch the profiler here and, through the shared directory, in every worker"""
+        if enabled:
+            self.profiler.start(slowest)
+        else:
+            self.profiler.stop()
+        if self.directory is not None:
+            control = {'enabled': self.profiler.enabled, 'slowest': self.profiler.slowest}
+            os.makedirs(self.directory, exist_ok=True)
+            _write_json(os.path.join(self.directory, PROFILER_CONTROL), control)
+            self._control = control
+
+    def apply_profiler_control(self):
+        """Follow a profiler switch made through another worker"""
+        try:
+            with open(os.path.join(self.directory, PROFILER_CONTROL)) as f:
+                control = json.load(f)
+        except (OSError, ValueError):
+            return
+        if control == self._control:
+            return
+        self._control = control
+        if control.get('enabled'):
+            self.profiler.start(control.get('slowest'))
+        else:
+            self.profiler.stop()
+
+    def _states(self):
+        """
+        State of every worker: live workers' files, exited workers' totals
+        and this process's live state
+        """
+        if self.directory is None:
+            return [self.state()]
+        own = os.path.basename(self._state_path())
+        # Worker files are read before the exited totals: a worker folded in
+        # between is then skipped through `folded` instead of counted twice
+        workers = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, 'worker-*.json'))):
+            name = os.path.basename(path)
+            if name != own:
+                workers[name] = _read_json(path)
+        exited = _read_json(os.path.join(self.directory, EXITED_STATE))
+        folded = set(exited['folded']) if exited is not None else set()
+        states = [state for name, state in workers.items() if state is not None and name not in folded]
+        if exited is not None:
+            states.append(exited)
+        states.append(self.state())
+        return states
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format, across every worker"""
+        histograms, counters = _merge(self._states())
+
+        sections = [
+            ('mmr_request_duration_seconds', 'histogram', 'Request latency by route', histograms['latency']),
+            ('mmr_stage_duration_seconds', 'histogram', 'Latency of instrumented handler stages', histograms['stages']),
+            ('mmr_request_size_bytes', 'histogram', 'Request body size by route', histograms['request_bytes']),
+            ('mmr_response_size_bytes', 'histogram', 'Response body size by route', histograms['response_bytes']),
+            ('mmr_requests_total', 'counter', 'Requests by route and status', counters['requests']),
+            ('mmr_request_errors_total', 'counter', 'Requests that failed with a 5xx or an exception', counters['errors']),
+        ]
+        lines = []
+        for name, kind, help_text, series in sections:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for key, value in sorted(series.items()):
+                labels = key if isinstance(key, tuple) else (('stage', key),)
+                if kind == 'histogram':
+                    lines.extend(value.render(name, labels))
+                else:
+                    lines.append(f'{name}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def dump_profiles(self):
+        """Folded stacks of the slowest requests across every worker"""
+        entries = [entry for state in self._states() for entry in state['profiles']]
+        return self.profiler.dump(entries)
+
+
+class _Stage:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.metrics.observe_stage(self.name, time.perf_counter() - self.start)
+
+
+class SlowRequestProfiler:
+    """
+    Samples the stacks of threads serving requests and keeps the samples of
+    the `slowest` slowest requests, as folded stacks ("a;b;c count") ready
+    for flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, slowest=0, interval=0.005):
+        self.slowest = slowest
+        self.interval = interval
+        self.enabled = False
+        self._active = {}
+        self._kept = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = None
+        self._pid = None
+
+    def start(self, slowest=None):
+        if slowest is not None:
+            self.slowest = slowest
+        self.enabled = self.slowest > 0
+
+    def stop(self):
+        self.enabled = False
+        with self._lock:
+            if self._stop is not None:
+                self._stop.set()
+            self._pid = None
+        self._active.clear()
+
+    def begin(self):
+        if not self.enabled:
+            return
+        # The sampler thread is started per process, on its first request,
+        # so gunicorn workers forked from a preloaded app each get one
+        if self._pid != os.getpid():
+            self._spawn()
+        self._active[threading.get_ident()] = Counter()
+
+    def _spawn(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            threading.Thread(target=self._sample, args=(self._stop,), name='mmr-profiler', daemon=True).start()
+
+    def end(self, label, seconds):
+        samples = self._active.pop(threading.get_ident(), None)
+        if samples is None or label is None:
+            return
+        entry = (seconds, next(self._sequence), label, samples)
+        with self._lock:
+            if len(self._kept) < self.slowest:
+                heapq.heappush(self._kept, entry)
+            elif seconds > self._kept[0][0]:
+                heapq.heapreplace(self._kept, entry)
+
+    def state(self):
+        """Kept requests as (seconds, label, {stack: count}) lists"""
+        with self._lock:
+            return [[seconds, label, dict(samples)] for seconds, _, label, samples in self._kept]
+
+    def dump(self, entries=None):
+        """Folded stacks per kept request (or per entry of `entries`, see state()), slowest first"""
+        if entries is None:
+            entries = self.state()
+        kept = heapq.nlargest(self.slowest or len(entries), entries, key=lambda entry: entry[0])
+        lines = []
+        for seconds, label, samples in kept:
+            lines.append(f'# {label} {seconds * 1000:.1f} ms, {sum(samples.values())} samples')
+            lines.extend(f'{stack} {count}' for stack, count in Counter(samples).most_common())
+        return '\n'.join(lines) + '\n'
+
+    def _sample(self, stop):
+        while not stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, samples in list(self._active.items()):
+                frame = frames.get(ident)
+                if frame is not None:
+                    samples[_fold(frame)] += 1
+
+
+def fold_exited_worker(directory, pid):
+    """
+    Add the numbers of the exited worker `pid` to the exited workers'
+    totals and delete its file; called from gunicorn's child_exit hook
+    """
+    paths = glob.glob(os.path.join(directory, f'worker-{pid}-*.json'))
+    if not paths:
+        return
+    exited_path = os.path.join(directory, EXITED_STATE)
+    exited = _read_json(exited_path) or {'folded': []}
+    states = [state for state in map(_read_json, paths) if state is not None] + [exited]
+    histograms, counters = _merge(states)
+    profiles = heapq.nlargest(
+        EXITED_PROFILES, (entry for state in states for entry in state.get('profiles', ())), key=lambda e: e[0]
+    )
+    # Names of files already deleted can no longer be read by a scrape
+    folded = [name for name in exited['folded'] if os.path.exists(os.path.join(directory, name))]
+    folded.extend(os.path.basename(path) for path in paths)
+    _write_json(exited_path, dict(_state(histograms, counters, profiles), folded=folded))
+    for path in paths:
+        os.remove(path)
+
+
+def _state(histograms, counters, profiles):
+    return {
+        'histograms': {
+            name: [[key, h.counts, h.sum, h.count] for key, h in series.items()]
+            for name, series in histograms.items()
+        },
+        'counters': {name: list(series.items()) for name, series in counters.items()},
+        'profiles': profiles,
+    }
+
+
+def _merge(states):
+    """Histograms and counters summed over `states`"""
+    histograms = {name: {} for name in HISTOGRAMS}
+    counters = {name: Counter() for name in COUNTERS}
+    for state in states:
+        for name, series in state.get('histograms', {}).items():
+            for key, counts, total, count in series:
+                _histogram(histograms[name], _key(key), HISTOGRAMS[name]).merge(counts, total, count)
+        for name, series in state.get('counters', {}).items():
+            for key, value in series:
+                counters[name][_key(key)] += value
+    return histograms, counters
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # gone, or being replaced; its numbers are in the next scrape
+
+
+def _write_json(path, value):
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(value, f)
+    os.replace(tmp_path, path)
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _fold(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def _key(key):
+    """A series key read back from JSON: stage names stay strings, label pairs become tuples"""
+    return key if isinstance(key, str) else tuple(tuple(pair) for pair in key)
+
+
+def _histogram(series, key, buckets):
+    histogram = series.get(key)
+    if histogram is None:
+        histogram = series[key] = Histogram(buckets)
+    return histogram
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
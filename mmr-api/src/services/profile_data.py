@@ -0,0 +1,39 @@
+"""
+Loading of the profile databases shared with the frontend (src/data)
+"""
+import json
+import os
+
+# Source name -> database file in MMR_DATA_DIR
+PROFILE_DATABASES = {
+    'six_pillar': '6_pillar_json_database.json',
+    'mmr_complete': 'mmr_complete_database.json',
+}
+
+# Category groups of the frontend's category navigation, in MMR_DATA_DIR
+CATEGORY_NAVIGATION = 'category_navigation.json'
+
+# Where a person appears in several databases, the version from the first
+# source here is the one listed and counted: the hand-maintained database
+SOURCE_PRIORITY = ('mmr_complete', 'six_pillar')
+
+
+def read_database(path):
+    """Profiles from one database file; both the bare list and {"profiles": [...]} layouts"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return data['profiles'] if isinstance(data, dict) else data
+
+
+def load_profiles(data_dir):
+    """(source, profile) pairs from every profile database, in file order"""
+    for source, filename in PROFILE_DATABASES.items():
+        for profile in read_database(os.path.join(data_dir, filename)):
+            yield source, profile
+
+
+def load_category_ids(data_dir):
+    """Category ids ("israeli-politicians", ...) of the frontend's category navigation"""
+    with open(os.path.join(data_dir, CATEGORY_NAVIGATION), encoding='utf-8') as f:
+        groups = json.load(f)['category_groups']
+    return [category['id'] for group in groups for category in group['categories']]
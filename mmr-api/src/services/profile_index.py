@@ -0,0 +1,302 @@
+"""
+In-memory indexes over the profile databases for /api/profiles
+"""
+import re
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+
+NON_LETTERS_RE = re.compile(r'[^a-zA-Z ]')
+NON_ALNUM_RE = re.compile(r'[^0-9a-z]+')
+
+STATUS_COLORS = {
+    'Pass': '#4CAF50',
+    'Partial': '#FFC107',
+    'Fail': '#fde8e8',
+}
+
+PILLAR_COLORS = {
+    'Pass': 'green',
+    'Partial': 'yellow',
+    'Fail': 'red',
+}
+
+OVERALL_ICONS = {
+    'Pass': '🟢',
+    'Partial': '⚠️',
+    'Fail': '❌',
+}
+
+# Primary sort key of sortingScore
+OVERALL_RANK = {
+    'Fail': 1,
+    'Partial': 2,
+    'Pass': 3,
+}
+
+# Sort orders accepted by ProfileIndex.query, as offered by ProfileGrid.jsx
+SORT_ORDERS = ('high-to-low', 'low-to-high')
+
+
+@lru_cache(maxsize=4096)
+def normalize_name(name):
+    """Case-, accent- and punctuation-insensitive key for names and pillar titles"""
+    name = name or ''
+    if not name.isascii():
+        decomposed = unicodedata.normalize('NFKD', name)
+        name = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return NON_ALNUM_RE.sub(' ', name.lower()).strip()
+
+
+def clean_assessment(assessment):
+    """Assessment text without emoji, e.g. "⚠️ Partial" -> "partial" """
+    return NON_LETTERS_RE.sub('', assessment or '').strip().lower()
+
+
+def rating_status(rating):
+    """Pass / Partial / Fail for an overall rating ("❌ Failing", "Full Pass"), or None if it names none"""
+    overall = clean_assessment(rating)
+    if 'fail' in overall:
+        return 'Fail'
+    if 'partial' in overall or 'mixed' in overall or 'weak' in overall:
+        return 'Partial'
+    if 'pass' in overall or 'strong' in overall:
+        return 'Pass'
+    return None
+
+
+def overall_status(profile):
+    """Pass / Partial / Fail from overall_rating or overall_alignment; Partial if unrecognised"""
+    return rating_status(profile.get('overall_rating') or profile.get('overall_alignment')) or 'Partial'
+
+
+def pillar_status(assessment):
+    """Pass / Partial / Fail / ... for a pillar assessment (see dataTransform.js)"""
+    clean = clean_assessment(assessment)
+    if clean == 'strong pass':
+        clean = 'pass'
+    if clean in ('strong fail', 'clear fail'):
+        clean = 'fail'
+    return clean[:1].upper() + clean[1:]
+
+
+def sorting_score(status, pillars):
+    """Overall rank first, pillar breakdown as tie-breaker (see dataTransform.js)"""
+    assessments = [p.get('assessment') for p in pillars]
+    pillar_score = 2 * assessments.count('Pass') + assessments.count('Partial') - 2 * assessments.count('Fail')
+    return OVERALL_RANK.get(status, -99) * 10000 + pillar_score
+
+
+def transform_profile(profile):
+    """
+    Component-format profile, mirroring transformProfile in dataTransform.js
+    """
+    status = overall_status(profile)
+
+    pillars = []
+    for pillar in profile.get('pillars', []):
+        status_name = pillar_status(pillar.get('assessment'))
+        pillars.append({
+            'name': (pillar.get('pillar') or '').replace(' / ', '/', 1),
+            'status': status_name,
+            'color': PILLAR_COLORS.get(status_name, 'yellow'),
+            'evidence': pillar.get('evidence'),
+        })
+
+    return {
+        'name': profile.get('subject') or profile.get('name'),
+        'title': profile.get('role'),
+        'category': profile.get('category'),
+        'status': status,
+        'statusColor': STATUS_COLORS[status],
+        'overall': f'🏁 Overall MMR Alignment: {OVERALL_ICONS[status]} {status}',
+        'reflection': profile.get('reflection'),
+        'pillars': pillars,
+        'sortingScore': sorting_score(status, profile.get('pillars', [])),
+        'affiliation': profile.get('affiliation'),
+    }
+
+
+class ProfileIndex:
+    """
+    Transformed profiles with posting lists for every filterable field.
+
+    Each sort order has its own sequence of profiles; posting lists hold
+    sorted positions in that sequence, so a filtered page is a bisect to the
+    cursor followed by a short walk, independent of the total profile count.
+
+    A person in several databases is listed once, from the first of their
+    sources in `source_priority` (sources not named there come after, in
+    the order seen), unless a `source` filter asks for one database. Every
+    posting list also exists restricted to listed profiles, under the key
+    prefixed with 'listed', so those queries never walk unlisted positions.
+
+    Categories are matched by `category_ids` (the frontend's category
+    navigation), which both databases' spellings map to, see category_key().
+    """
+
+    def __init__(self, profiles, source_priority=(), category_ids=()):
+        """`profiles` is an iterable of (source, raw profile) pairs"""
+        # Longest first, so "palestinian-authority" beats "palestinian"
+        self._category_ids = sorted(category_ids, key=len, reverse=True)
+        self.profiles = []
+        self._ids = {}
+        names = []
+        keys = []
+        for source, raw in profiles:
+            record = transform_profile(raw)
+            record['source'] = source
+            names.append(normalize_name(record['name']))
+            record['id'] = self._unique_id(f"{source}:{names[-1].replace(' ', '-')}")
+            self._ids[record['id']] = len(self.profiles)
+            self.profiles.append(record)
+            keys.append(self._index_keys(record, raw))
+
+        ranks = {source: n for n, source in enumerate(source_priority)}
+        preferred = {}
+        for pid, (name, record) in enumerate(zip(names, self.profiles)):
+            rank = ranks.setdefault(record['source'], len(ranks))
+            if name not in preferred or rank < preferred[name][0]:
+                preferred[name] = (rank, pid)
+        for _, pid in preferred.values():
+            keys[pid] |= {('listed',) + key for key in keys[pid]}
+            keys[pid].add(('listed',))
+
+        # Ties keep database order in both directions, like a stable JS sort
+        scores = [record['sortingScore'] for record in self.profiles]
+        self._sequences = {
+            'high-to-low': sorted(range(len(scores)), key=lambda pid: -scores[pid]),
+            'low-to-high': sorted(range(len(scores)), key=lambda pid: scores[pid]),
+        }
+
+        self._ranks = {}
+        self._postings = {}
+        for order, sequence in self._sequences.items():
+            rank = [0] * len(sequence)
+            postings = {}
+            for position, pid in enumerate(sequence):
+                rank[pid] = position
+                for key in keys[pid]:
+                    postings.setdefault(key, []).append(position)
+            self._ranks[order] = rank
+            self._postings[order] = postings
+
+        # Sorted (normalized name, profile id) pairs for exact and prefix lookups
+        self._names = sorted(zip(names, range(len(names))))
+
+    def _unique_id(self, base):
+        candidate, n = base, 2
+        while candidate in self._ids:
+            candidate, n = f'{base}-{n}', n + 1
+        return candidate
+
+    def category_key(self, category):
+        """
+        The category id a category in either spelling belongs to: the
+        navigation id equal to its slug ("Israeli Politicians" ->
+        "israeli-politicians") or starting it ("Journalists & Media Figures"
+        -> "journalists"), else the slug itself
+        """
+        if category is None:
+            return None
+        slug = normalize_name(category).replace(' ', '-')
+        for category_id in self._category_ids:
+            if slug == category_id or slug.startswith(category_id + '-'):
+                return category_id
+        return slug
+
+    def _index_keys(self, record, raw):
+        keys = {
+            ('category', self.category_key(record['category'])),
+            ('status', record['status']),
+            ('source', record['source']),
+        }
+        for raw_pillar, pillar in zip(raw.get('pillars', []), record['pillars']):
+            pillar_key = normalize_name(raw_pillar.get('pillar'))
+            keys.add(('pillar', pillar_key))
+            keys.add(('pillar', pillar_key, pillar['status']))
+            keys.add(('assessment', pillar['status']))
+        return keys
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def get(self, profile_id):
+        pid = self._ids.get(profile_id)
+        return None if pid is None else self.profiles[pid]
+
+    def query(self, category=None, status=None, source=None, pillar=None, assessment=None,
+              name=None, sort='high-to-low', cursor=None, limit=20):
+        """
+        One page of matching profiles and the cursor for the next page.
+
+        `pillar` and `assessment` filter together (an omitted assessment
+        matches any, an assessment alone matches it on any pillar); status
+        and assessment are matched like pillar_status, so "pass" and
+        "✅ Pass" are the same. `name` is a prefix of the normalized name.
+        """
+        if sort not in self._sequences:
+            raise ValueError(f'sort must be one of {", ".join(SORT_ORDERS)}')
+        if cursor is not None and cursor < 0:
+            raise ValueError('cursor must not be negative')
+        sequence = self._sequences[sort]
+        postings = self._postings[sort]
+
+        # Without a source filter every list is the listed-only one
+        prefix = () if source is not None else ('listed',)
+        keys = []
+        if status is not None:
+            status = pillar_status(status)
+        for key in (('category', self.category_key(category)), ('status', status), ('source', source)):
+            if key[1] is not None:
+                keys.append(key)
+        if pillar is not None:
+            key = ('pillar', normalize_name(pillar))
+            if assessment is not None:
+                key += (pillar_status(assessment),)
+            keys.append(key)
+        elif assessment is not None:
+            keys.append(('assessment', pillar_status(assessment)))
+        lists = [postings.get(prefix + key, []) for key in keys]
+        if name:
+            lists.append(self._name_positions(normalize_name(name), self._ranks[sort]))
+        if prefix and not keys:
+            lists.append(postings.get(prefix, []))
+
+        start = -1 if cursor is None else cursor
+        positions = range(start + 1, len(sequence)) if not lists else _intersect(lists, start + 1)
+        page = []
+        for position in positions:
+            if len(page) == limit:
+                return [self.profiles[sequence[p]] for p in page], page[-1]
+            page.append(position)
+        return [self.profiles[sequence[p]] for p in page], None
+
+    def _name_positions(self, prefix, rank):
+        """Sorted positions of profiles whose normalized name starts with prefix"""
+        lo = bisect_left(self._names, (prefix,))
+        hi = bisect_left(self._names, (prefix + '\uffff',))
+        return sorted(rank[pid] for _, pid in self._names[lo:hi])
+
+
+def _intersect(lists, position):
+    """
+    Positions from `position` on that are in every sorted list, ascending.
+
+    A leapfrog join: each list bisects forward to the largest candidate so
+    far, so runs of positions missing from any one list are skipped in a
+    single step instead of being walked.
+    """
+    lists = sorted(lists, key=len)
+    starts = [0] * len(lists)
+    while True:
+        for n, positions in enumerate(lists):
+            i = starts[n] = bisect_left(positions, position, starts[n])
+            if i == len(positions):
+                return
+            if positions[i] != position:
+                position = positions[i]
+                break
+        else:
+            yield position
+            position += 1
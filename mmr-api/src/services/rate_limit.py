@@ -0,0 +1,200 @@
+"""
+Per-client token-bucket rate limiting with pluggable bucket stores
+
+Each client gets a bucket of `burst` tokens refilled at `rate` tokens per
+second; a request takes one token (a batch one per distinct prompt), or is
+refused with a 429 and a Retry-After of the time until enough tokens are
+back. CORS preflights are never charged. Buckets live in a store:
+
+  MemoryStore   per process (the default; limits are per gunicorn worker)
+  SQLiteStore   a SQLite file shared by every worker on the host, standing
+                in for a shared store such as Redis
+
+Any object with the same take(key, rate, burst, cost) method can be plugged in.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from flask import jsonify, request
+
+# Endpoints limited by default: the MMR analysis routes in src/main.py
+LIMITED_ENDPOINTS = ('mmr_query', 'mmr_query_batch', 'mmr_query_stream')
+
+# Endpoints taking {"prompts": [...]}, charged one token per distinct prompt
+BATCH_ENDPOINTS = ('mmr_query_batch',)
+
+
+def refill(tokens, updated, now, rate, burst, cost=1):
+    """The bucket's tokens after `cost` are taken if available, and the seconds to wait (0 if taken)"""
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate
+
+
+class MemoryStore:
+    """Buckets in a dict; idle clients are swept once it holds more than `max_keys`"""
+
+    def __init__(self, max_keys=100000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = {}
+        self._sweep_at = max_keys
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1):
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens, wait = refill(tokens, updated, now, rate, burst, cost)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self._sweep_at:
+                self._sweep(now, burst / rate)
+        return wait
+
+    def _sweep(self, now, full_after):
+        # A bucket idle long enough to be full is the same as no bucket
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if now - bucket[1] < full_after}
+        self._sweep_at = max(self.max_keys, 2 * len(self._buckets))
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteStore:
+    """
+    Buckets in a SQLite file, updated in one transaction per request so
+    every process on the host sees the same counts. Connections are opened
+    per thread and per process, after any fork.
+    """
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self._local = threading.local()
+        self._takes = 0
+        connection = self._connect()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS rate_limit_buckets '
+            '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+        )
+        connection.close()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=OFF')  # buckets are disposable
+        return connection
+
+    def _connection(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.connection = self._connect()
+            local.pid = os.getpid()
+        return local.connection
+
+    def take(self, key, rate, burst, cost=1):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            now = self.clock()
+            row = connection.execute(
+                'SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            tokens, wait = refill(*(row or (burst, now)), now, rate, burst, cost)
+            connection.execute(
+                'INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                (key, tokens, now),
+            )
+            self._takes += 1
+            if self._takes % self.SWEEP_EVERY == 0:
+                connection.execute('DELETE FROM rate_limit_buckets WHERE updated < ?', (now - burst / rate,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return wait
+
+
+class RateLimiter:
+    """
+    Token buckets per client address for `endpoints`, checked before the
+    request is handled. Disabled limiters register nothing.
+    """
+
+    def __init__(self, store=None, rate=0.0, burst=1, enabled=False, endpoints=LIMITED_ENDPOINTS,
+                 batch_endpoints=BATCH_ENDPOINTS):
+        self.store = store if store is not None else MemoryStore()
+        self.rate = rate
+        self.burst = burst
+        self.enabled = enabled and rate > 0
+        self.endpoints = frozenset(endpoints)
+        self.batch_endpoints = frozenset(batch_endpoints)
+        self.limited = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        MMR_RATE_LIMIT=R allows R requests per second per client, in bursts
+        of MMR_RATE_BURST (default 2R, at least 1); MMR_RATE_LIMIT_STORE is
+        the path of a SQLite file to share buckets between workers
+        """
+        rate = float(os.environ.get('MMR_RATE_LIMIT', 0))
+        burst = int(os.environ.get('MMR_RATE_BURST', 0)) or max(1, math.ceil(2 * rate))
+        path = os.environ.get('MMR_RATE_LIMIT_STORE')
+        store = SQLiteStore(path) if path and rate > 0 else None
+        return cls(store=store, rate=rate, burst=burst, enabled=rate > 0)
+
+    def init_app(self, app):
+        app.extensions['mmr_rate_limiter'] = self
+        if self.enabled:
+            app.before_request(self._before_request)
+
+    def client_key(self):
+        # remote_addr is the peer address; behind reverse proxies, set
+        # MMR_PROXY_COUNT so src/wsgi.py takes it from X-Forwarded-For
+        return request.remote_addr or 'unknown'
+
+    def request_cost(self):
+        """Tokens the current request takes: one, or one per distinct prompt of a batch"""
+        if request.endpoint not in self.batch_endpoints:
+            return 1
+        data = request.get_json(silent=True)
+        prompts = data.get('prompts') if isinstance(data, dict) else None
+        if not isinstance(prompts, list):
+            return 1  # rejected by the endpoint
+        return max(1, len({prompt for prompt in prompts if isinstance(prompt, str)}))
+
+    def check(self, key, cost=1):
+        """Seconds the client must wait, or 0 when the request may proceed"""
+        wait = self.store.take(key, self.rate, self.burst, cost)
+        if wait:
+            with self._lock:
+                self.limited += 1
+        return wait
+
+    def _before_request(self):
+        # Preflights resolve to the same endpoint but are answered by CORS
+        if request.method == 'OPTIONS' or request.endpoint not in self.endpoints:
+            return None
+        cost = self.request_cost()
+        if cost > self.burst:
+            # Never affordable, however long the client waits
+            return jsonify({'error': f'At most {self.burst} distinct prompts per batch under the rate limit'}), 413
+        wait = self.check(self.client_key(), cost)
+        if not wait:
+            return None
+        retry_after = max(1, math.ceil(wait))
+        response = jsonify({'error': f'Rate limit exceeded, retry in {retry_after} s'})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    def stats(self):
+        return {'rate': self.rate, 'burst': self.burst, 'limited': self.limited}
@@ -0,0 +1,125 @@
+"""
+In-process cache of pre-encoded MMR query responses
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+try:
+    import brotli
+except ImportError:  # optional: brotli variants are skipped without it
+    brotli = None
+
+
+class CachedResponse:
+    """
+    A JSON body encoded once, with its compressed variants and weak ETag.
+
+    The ETag is derived from `validator` when given: the bytes identifying
+    the content without per-process details such as a timestamp, so every
+    worker, and every rebuild of an evicted entry, tags the same content
+    the same way. It is weak because those bytes, and the identity, gzip
+    and br codings, differ while the content is the same.
+    """
+
+    def __init__(self, body, validator=None):
+        self.body = body
+        self.etag = hashlib.sha256(body if validator is None else validator).hexdigest()[:32]
+        self.variants = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(body)
+
+    def make_response(self, request):
+        """
+        Build a 200 response, or a 304 when a GET/HEAD client's copy is
+        current. Other methods get a 412 for a matching If-None-Match, as
+        RFC 9110 requires.
+        """
+        response = current_app.response_class(mimetype='application/json')
+        response.set_etag(self.etag, weak=True)
+        response.vary.add('Accept-Encoding')
+
+        # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+        if request.if_none_match.contains_weak(self.etag):
+            response.status_code = 304 if request.method in ('GET', 'HEAD') else 412
+            return response
+
+        encoding = self.negotiate(request.accept_encodings)
+        if encoding is None:
+            response.set_data(self.body)
+        else:
+            response.set_data(self.variants[encoding])
+            response.content_encoding = encoding
+        return response
+
+    def negotiate(self, accept_encodings):
+        """Pick the preferred compressed variant the client accepts"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings[encoding]:
+                return encoding
+        return None
+
+
+class ResponseCache:
+    """
+    Responses keyed by resolved topic.
+
+    Registered topics are few and fixed, so they are kept for the life of the
+    process; templated fallback entries go through an LRU of `maxsize` items.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._static = {}
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build, static=False):
+        """
+        Return the cached entry for `key`. On a miss `build(key)` gives the
+        encoded body, or a (body, validator) pair, see CachedResponse
+        """
+        with self._lock:
+            entry = self._static.get(key) if static else self._lru.get(key)
+            if entry is not None:
+                self.hits += 1
+                if not static:
+                    self._lru.move_to_end(key)
+                return entry
+            self.misses += 1
+
+        # Encode outside the lock; a concurrent miss just builds the same bytes
+        built = build(key)
+        entry = CachedResponse(*built) if isinstance(built, tuple) else CachedResponse(built)
+
+        with self._lock:
+            if static:
+                self._static[key] = entry
+            else:
+                self._lru[key] = entry
+                self._lru.move_to_end(key)
+                while len(self._lru) > self.maxsize:
+                    self._lru.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._static.clear()
+            self._lru.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._static) + len(self._lru),
+                'lru_entries': len(self._lru),
+                'lru_maxsize': self.maxsize,
+            }
@@ -0,0 +1,181 @@
+"""
+Incrementally maintained category and overall statistics for /api/stats
+"""
+import math
+import threading
+from collections import Counter
+
+from src.services.profile_index import overall_status
+from src.services.scoring import map_outcome_to_category
+
+# Outcome categories counted by calculateGroupStatistics, and their keys
+OUTCOME_KEYS = {
+    'Pass': 'pass',
+    'Almost Pass': 'almostPass',
+    'Partial': 'partial',
+    'Fail': 'fail',
+}
+
+
+def js_round(value):
+    """Math.round: halves round up"""
+    return math.floor(value + 0.5)
+
+
+class RollupStats:
+    """
+    Per-category and overall tallies of overall rating and MMR v8 outcome.
+
+    Every profile's contribution is remembered, so adding, editing or
+    removing a profile (or one of its pillar assessments) only subtracts the
+    old contribution and adds the new one: O(1) in the number of profiles.
+    """
+
+    def __init__(self, scorer):
+        self.scorer = scorer
+        self._profiles = {}
+        self._contributions = {}
+        self._tallies = {None: Counter()}
+        self._lock = threading.Lock()
+
+    def _contribution(self, profile):
+        outcome = self.scorer.score(profile)
+        return profile.get('category'), overall_status(profile), map_outcome_to_category(outcome)
+
+    def _apply(self, contribution, sign):
+        category, status, outcome = contribution
+        for scope in _scopes(category):
+            tally = self._tallies.get(scope)
+            if tally is None:
+                tally = self._tallies[scope] = Counter()
+            tally['total'] += sign
+            tally[('status', status)] += sign
+            tally[('outcome', outcome)] += sign
+            if scope is not None and tally['total'] == 0:
+                del self._tallies[scope]
+
+    def _replace(self, profile_id, profile):
+        old = self._contributions.pop(profile_id, None)
+        if old is not None:
+            self._apply(old, -1)
+            del self._profiles[profile_id]
+        if profile is not None:
+            new = self._contribution(profile)
+            self._apply(new, 1)
+            self._profiles[profile_id] = profile
+            self._contributions[profile_id] = new
+
+    def add_profile(self, profile_id, profile):
+        """Add a profile, or replace the profile already stored under this id"""
+        profile = dict(profile, pillars=[dict(p) for p in profile.get('pillars', [])])
+        with self._lock:
+            self._replace(profile_id, profile)
+
+    update_profile = add_profile
+
+    def remove_profile(self, profile_id):
+        with self._lock:
+            if profile_id not in self._profiles:
+                raise KeyError(profile_id)
+            self._replace(profile_id, None)
+
+    def set_pillar_assessment(self, profile_id, pillar, assessment):
+        """Edit a pillar's assessment, adding the pillar if the profile lacks it"""
+        with self._lock:
+            profile = dict(self._profiles[profile_id])
+            pillars = [dict(p) for p in profile['pillars']]
+            for entry in pillars:
+                if entry.get('pillar') == pillar:
+                    entry['assessment'] = assessment
+                    break
+            else:
+                pillars.append({'pillar': pillar, 'assessment': assessment})
+            profile['pillars'] = pillars
+            self._replace(profile_id, profile)
+
+    def remove_pillar(self, profile_id, pillar):
+        with self._lock:
+            profile = dict(self._profiles[profile_id])
+            profile['pillars'] = [p for p in profile['pillars'] if p.get('pillar') != pillar]
+            self._replace(profile_id, profile)
+
+    def recompute(self):
+        """Tallies rebuilt from scratch over every stored profile"""
+        with self._lock:
+            profiles = list(self._profiles.values())
+        tallies = {None: Counter()}
+        for profile in profiles:
+            category, status, outcome = self._contribution(profile)
+            for scope in _scopes(category):
+                tally = tallies.setdefault(scope, Counter())
+                tally['total'] += 1
+                tally[('status', status)] += 1
+                tally[('outcome', outcome)] += 1
+        return tallies
+
+    def verify(self):
+        """Scopes whose incremental tallies disagree with a full recompute"""
+        expected = self.recompute()
+        with self._lock:
+            actual = {scope: +tally for scope, tally in self._tallies.items()}
+        expected = {scope: +tally for scope, tally in expected.items()}
+        return sorted(
+            ('overall' if scope is None else scope)
+            for scope in set(actual) | set(expected)
+            if actual.get(scope, Counter()) != expected.get(scope, Counter())
+        )
+
+    def snapshot(self):
+        """Statistics in the layout of mmr_complete_database.json, plus v8 outcomes"""
+        with self._lock:
+            tallies = {scope: Counter(tally) for scope, tally in self._tallies.items()}
+
+        overall = tallies.pop(None)
+        performance = _status_counts(overall, total_key='total_figures')
+        total = overall['total']
+        performance['pass_rate'] = f"{js_round(performance['passing'] / total * 100) if total else 0}%"
+        return {
+            'overall_performance': performance,
+            'by_category': {category: _status_counts(tally) for category, tally in sorted(tallies.items())},
+            'mmr_v8': {
+                'overall': _outcome_counts(overall),
+                'by_category': {category: _outcome_counts(tally) for category, tally in sorted(tallies.items())},
+            },
+        }
+
+
+def _scopes(category):
+    """Tally scopes a profile counts towards: overall (None) and its category"""
+    return (None,) if category is None else (None, category)
+
+
+def _status_counts(tally, total_key='total'):
+    return {
+        total_key: tally['total'],
+        'passing': tally[('status', 'Pass')],
+        'partial': tally[('status', 'Partial')],
+        'failing': tally[('status', 'Fail')],
+    }
+
+
+def _outcome_counts(tally):
+    """
+    Same fields as calculateGroupStatistics in mmrV8Calculations.js, over
+    the profiles the scorer could rate; the rest are counted as unscored
+    """
+    stats = {}
+    for category, key in OUTCOME_KEYS.items():
+        stats[key] = tally[('outcome', category)]
+    stats['total'] = sum(stats.values())
+    stats['unscored'] = tally['total'] - stats['total']
+    if not stats['total']:
+        stats.update(passRate=0, level='No Data')
+        return stats
+    stats['passRate'] = js_round((stats['pass'] + stats['almostPass']) / stats['total'] * 100)
+    if stats['passRate'] >= 80:
+        stats['level'] = 'Strong'
+    elif stats['passRate'] >= 60:
+        stats['level'] = 'Mixed'
+    else:
+        stats['level'] = 'Needs Improvement'
+    return stats
@@ -0,0 +1,176 @@
+"""
+MMR v8 outcome scoring
+
+A server-side port of computeMMROutcome (src/utils/mmrV8Calculations.js).
+The rules file is compiled once into lookup tables; profiles are encoded as
+small-integer byte strings and outcomes are memoised by their encoded
+signature, so a batch of thousands of profiles mostly costs one table lookup
+per profile.
+"""
+import json
+import re
+
+# Order of the per-profile counters in a counts tuple
+COUNTERS = (
+    'num_fails',
+    'num_partial_or_mixed',
+    'num_pass_or_strong',
+    'num_strong_pass',
+    'priority_pass',
+    'priority_partial',
+    'priority_fails',
+)
+
+# Ratings the "2+ priority partials" rule caps to Partial Indicators
+CAPPED_RATINGS = ('High Positive Indicators', 'Positive Indicators', 'Emerging Positive Indicators')
+
+OUTCOME_CATEGORIES = {
+    'High Positive Indicators': 'Pass',
+    'Positive Indicators': 'Almost Pass',
+    'Emerging Positive Indicators': 'Almost Pass',
+    'Partial Indicators': 'Partial',
+    'Failing': 'Fail',
+    'Systemic Fail': 'Fail',
+}
+
+# Same test as /eliminationis/i in the JS: ASCII-only case folding
+ELIMINATIONIST_RE = re.compile('eliminationis', re.IGNORECASE | re.ASCII)
+
+# (condition key, counter index, is minimum) for the count conditions
+_CONDITIONS = (
+    ('min_fails', 0, True),
+    ('max_fails', 0, False),
+    ('min_partial_or_mixed', 1, True),
+    ('max_partial_or_mixed', 1, False),
+    ('min_pass_or_strong', 2, True),
+    ('min_strong_pass', 3, True),
+    ('min_priority_pass', 4, True),
+)
+
+_MEMO_LIMIT = 1 << 16
+
+
+def map_outcome_to_category(outcome):
+    """Simplified Pass / Almost Pass / Partial / Fail category for an outcome"""
+    return OUTCOME_CATEGORIES.get(outcome, 'Unknown')
+
+
+class MMRScorer:
+    """
+    Scores profiles against a compiled MMR v8 rules document
+    """
+
+    def __init__(self, rules):
+        bands = rules['pillar_bands']
+        fail_band = set(bands['Fail Indicators'])
+        partial_band = set(bands['Partial Indicators'])
+        positive_band = set(bands['Positive Indicators'])
+
+        # Assessment code 0 is reserved for strings no rule mentions
+        assessments = sorted(fail_band | partial_band | positive_band | {'Strong Pass'})
+        self._assessment_codes = {name: code for code, name in enumerate(assessments, 1)}
+        self._priority_pillars = frozenset(rules['priority_pillars'])
+
+        # Pillar slot = assessment code * 2 + is_priority; each slot maps to
+        # its increments for every counter in COUNTERS
+        self._slot_deltas = []
+        for name in [None] + assessments:
+            for priority in (False, True):
+                fail = name in fail_band
+                partial = name in partial_band
+                positive = name in positive_band
+                self._slot_deltas.append((
+                    int(fail),
+                    int(partial),
+                    int(positive),
+                    int(name == 'Strong Pass'),
+                    int(priority and positive),
+                    int(priority and partial),
+                    int(priority and fail),
+                ))
+
+        # Highest priority first; sorted() is stable like Array.prototype.sort
+        self._levels = []
+        for level in sorted(rules['outcome_levels'], key=lambda level: -level['priority']):
+            cond = level['conditions']
+            checks = tuple(
+                (index, cond[key], is_min) for key, index, is_min in _CONDITIONS if key in cond
+            )
+            flag_condition = bool(cond['eliminationist_flag']) if 'eliminationist_flag' in cond else None
+            self._levels.append((level['rating'], flag_condition, checks))
+
+        self._memo = {}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def encode(self, profile):
+        """Encode a profile as (pillar slot bytes, eliminationist flag)"""
+        codes = self._assessment_codes
+        priority = self._priority_pillars
+        slots = bytes(sorted(
+            codes.get(p.get('assessment'), 0) * 2 + (p.get('pillar') in priority)
+            for p in profile['pillars']
+        ))
+        flag = ELIMINATIONIST_RE.search(profile.get('reflection') or '') is not None
+        return slots, flag
+
+    def counts(self, slots):
+        """Counter tuple (see COUNTERS) for encoded pillar slots"""
+        totals = [0] * len(COUNTERS)
+        deltas = self._slot_deltas
+        for slot in set(slots):
+            n = slots.count(slot)
+            for i, delta in enumerate(deltas[slot]):
+                totals[i] += delta * n
+        return tuple(totals)
+
+    def score(self, profile):
+        """The MMR v8 outcome rating for one profile"""
+        return self._score_encoded(self.encode(profile))
+
+    def score_batch(self, profiles):
+        """Outcome ratings for many profiles, in input order"""
+        encode = self.encode
+        score_encoded = self._score_encoded
+        return [score_encoded(encode(profile)) for profile in profiles]
+
+    def _score_encoded(self, signature):
+        outcome = self._memo.get(signature)
+        if outcome is None:
+            outcome = self._evaluate(self.counts(signature[0]), signature[1])
+            if len(self._memo) >= _MEMO_LIMIT:
+                self._memo.clear()
+            self._memo[signature] = outcome
+        return outcome
+
+    def _evaluate(self, counts, eliminationist_flag):
+        """Decision rules, in the same order as computeMMROutcome"""
+        num_fails = counts[0]
+        priority_partial = counts[5]
+        priority_fails = counts[6]
+
+        # Systemic Fail conditions first (highest priority)
+        if eliminationist_flag or num_fails >= 4:
+            return 'Systemic Fail'
+
+        # Any priority pillar fail caps at "Failing"
+        if priority_fails >= 1:
+            return 'Failing'
+
+        # 2+ priority partials cap positive ratings to "Partial Indicators"
+        capped = priority_partial >= 2
+
+        for rating, flag_condition, checks in self._levels:
+            if flag_condition is not None and flag_condition != eliminationist_flag:
+                continue
+            if any(counts[index] < bound if is_min else counts[index] > bound
+                   for index, bound, is_min in checks):
+                continue
+            if capped and rating in CAPPED_RATINGS:
+                return 'Partial Indicators'
+            return rating
+
+        return 'Unknown'
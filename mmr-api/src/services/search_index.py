@@ -0,0 +1,386 @@
+"""
+BM25 full-text search over profile evidence, source_context and reflection
+"""
+import heapq
+import html
+import math
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+
+from src.services.profile_index import normalize_name, pillar_status
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+# Searchable free-text fields; evidence passages belong to one pillar
+SEARCH_FIELDS = ('evidence', 'source_context', 'reflection')
+
+STOPWORDS = frozenset('''
+    a an and are as at be been but by for from has have he her his in is it its s
+    of on or she that the their them they this to was were which who will with
+'''.split())
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+# Impact-ordered postings of recently queried terms (and filters) are
+# cached up to this many postings in total
+IMPACT_CACHE_POSTINGS = 2000000
+
+SNIPPET_CHARS = 200
+SNIPPET_LEAD = 60
+MAX_SNIPPETS = 3
+
+
+def stem(word):
+    """
+    Light English suffix stripper: plurals, -ed, -ing and -ly, then a final
+    "e", so that "violates", "violated" and "violating" all give "violat".
+    """
+    if len(word) <= 3:
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+
+    for suffix in ('ingly', 'edly', 'ing', 'ed', 'ly'):
+        stripped = word[:-len(suffix)]
+        if word.endswith(suffix) and len(stripped) >= 3 and any(c in 'aeiouy' for c in stripped):
+            word = stripped
+            # "stopped" -> "stop", but "called" -> "call"
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in 'lsz':
+                word = word[:-1]
+            break
+
+    if word.endswith('e') and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def fold(token):
+    """Lowercase, accent-free form of one token"""
+    token = token.lower()
+    if not token.isascii():
+        decomposed = unicodedata.normalize('NFKD', token)
+        token = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return token
+
+
+@lru_cache(maxsize=65536)
+def term_of(token):
+    """Index term for one token, or None for a stopword"""
+    token = fold(token)
+    return None if token in STOPWORDS else stem(token)
+
+
+def analyze(text):
+    """Index terms of a text, in order, stopwords removed"""
+    return [term for term in map(term_of, TOKEN_RE.findall(text or '')) if term is not None]
+
+
+def highlight(text, terms):
+    """
+    HTML-escaped window of `text` around its first matching term, with
+    every match wrapped in <mark>
+    """
+    matches = [m for m in TOKEN_RE.finditer(text) if term_of(m.group()) in terms]
+    if not matches:
+        return None
+
+    start, end = 0, len(text)
+    if end > SNIPPET_CHARS:
+        start = max(0, matches[0].start() - SNIPPET_LEAD)
+        if start:
+            start = text.find(' ', start) + 1 or start
+        end = min(len(text), start + SNIPPET_CHARS)
+        if end < len(text):
+            space = text.rfind(' ', start, end)
+            if space > matches[0].end():
+                end = space
+
+    parts = ['…' if start else '']
+    position = start
+    for match in matches:
+        if match.start() < start:
+            continue
+        if match.end() > end:
+            break
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f'<mark>{html.escape(match.group())}</mark>')
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    parts.append('…' if end < len(text) else '')
+    return ''.join(parts)
+
+
+class SearchIndex:
+    """
+    Inverted index of profile passages, ranked with BM25.
+
+    A passage is one pillar's evidence, a profile's source_context or its
+    reflection; a profile ranks by its best matching passage. Passages are
+    added and removed per profile and document frequencies are read at query
+    time, so rebuilding from changed data only re-indexes changed profiles.
+
+    Queries walk each term's postings in descending BM25 contribution and
+    stop once no unread passage can reach the top `limit` profiles, so
+    selective queries read only the head of each list. Those impact-ordered
+    lists (already restricted to the query's filters) are sorted on first use
+    and cached until the next change to the index.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._passages = {}
+        self._lengths = {}
+        self._total_length = 0
+        self._profiles = {}
+        self._next_id = 0
+        self._impact_cache = OrderedDict()
+        self._impact_cache_size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._profiles)
+
+    @staticmethod
+    def _passages_of(profile):
+        for pillar in profile.get('pillars', []):
+            if pillar.get('evidence'):
+                yield ('evidence', normalize_name(pillar.get('pillar')), pillar_status(pillar.get('assessment')),
+                       pillar.get('pillar'), pillar['evidence'])
+        for field in ('source_context', 'reflection'):
+            if profile.get(field):
+                yield field, None, None, None, profile[field]
+
+    def add_profile(self, profile_id, profile, source=None):
+        """
+        Index a profile, or re-index the one stored under this id.
+
+        Returns False without touching the index when nothing searchable changed.
+        """
+        passages = tuple(self._passages_of(profile))
+        meta = (profile.get('subject') or profile.get('name'), profile.get('category'), source)
+        fingerprint = hash((meta, passages))
+        with self._lock:
+            current = self._profiles.get(profile_id)
+            if current is not None and current[0] == fingerprint:
+                return False
+            if current is not None:
+                self._remove(profile_id)
+            self._clear_impacts()
+            ids = []
+            for passage in passages:
+                ids.append(self._add_passage(profile_id, passage))
+            self._profiles[profile_id] = (fingerprint, ids, meta)
+        return True
+
+    update_profile = add_profile
+
+    def remove_profile(self, profile_id):
+        with self._lock:
+            if profile_id not in self._profiles:
+                raise KeyError(profile_id)
+            self._remove(profile_id)
+            self._clear_impacts()
+
+    def rebuild(self, profiles):
+        """
+        Bring the index in line with `profiles`, (profile id, source, profile)
+        triples; profiles that are unchanged are not re-indexed.
+        """
+        counts = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        seen = set()
+        for profile_id, source, profile in profiles:
+            seen.add(profile_id)
+            existed = profile_id in self._profiles
+            if not self.add_profile(profile_id, profile, source):
+                counts['unchanged'] += 1
+            else:
+                counts['updated' if existed else 'added'] += 1
+        for profile_id in set(self._profiles) - seen:
+            self.remove_profile(profile_id)
+            counts['removed'] += 1
+        return counts
+
+    def _clear_impacts(self):
+        self._impact_cache.clear()
+        self._impact_cache_size = 0
+
+    def _add_passage(self, profile_id, passage):
+        passage_id = self._next_id
+        self._next_id += 1
+        terms = analyze(passage[-1])
+        self._passages[passage_id] = (profile_id,) + passage
+        self._lengths[passage_id] = len(terms)
+        self._total_length += len(terms)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+            postings[passage_id] = postings.get(passage_id, 0) + 1
+        return passage_id
+
+    def _remove(self, profile_id):
+        _, ids, _ = self._profiles.pop(profile_id)
+        for passage_id in ids:
+            passage = self._passages.pop(passage_id)
+            self._total_length -= self._lengths.pop(passage_id)
+            for term in set(analyze(passage[-1])):
+                postings = self._postings[term]
+                del postings[passage_id]
+                if not postings:
+                    del self._postings[term]
+
+    def search(self, query, pillar=None, assessment=None, field=None, source=None, limit=10):
+        """
+        The `limit` best matching profiles, each with its score and up to
+        MAX_SNIPPETS highlighted passages.
+
+        `pillar` and `assessment` restrict matches to evidence of that pillar
+        (an omitted pillar matches any pillar with that assessment); `field`
+        restricts them to one of SEARCH_FIELDS.
+        """
+        if field is not None and field not in SEARCH_FIELDS:
+            raise ValueError(f'field must be one of {", ".join(SEARCH_FIELDS)}')
+        if pillar is not None or assessment is not None:
+            if field not in (None, 'evidence'):
+                return []
+            field = 'evidence'
+        wanted = (
+            field,
+            None if pillar is None else normalize_name(pillar),
+            None if assessment is None else pillar_status(assessment),
+        )
+
+        with self._lock:
+            terms = [term for term in dict.fromkeys(analyze(query)) if term in self._postings]
+            if not terms:
+                return []
+            columns, best = self._score(terms, wanted, source, limit)
+            top = self._top(columns, best)
+
+        # Highlighting works on immutable copies, outside the lock
+        terms = set(terms)
+        results = []
+        for profile_id, score, (name, category, profile_source), passages in top:
+            snippets = []
+            for _, field, _, status, pillar, text in passages:
+                snippet = {'field': field, 'text': highlight(text, terms)}
+                if pillar is not None:
+                    snippet.update(pillar=pillar, status=status)
+                snippets.append(snippet)
+            results.append({
+                'id': profile_id,
+                'name': name,
+                'category': category,
+                'source': profile_source,
+                'score': round(score, 4),
+                'snippets': snippets,
+            })
+        return results
+
+    def _accepts(self, passage_id, wanted, source):
+        profile_id, field, pillar_key, status, _, _ = self._passages[passage_id]
+        want_field, want_pillar, want_status = wanted
+        return ((want_field is None or field == want_field)
+                and (want_pillar is None or pillar_key == want_pillar)
+                and (want_status is None or status == want_status)
+                and (source is None or self._profiles[profile_id][2][2] == source))
+
+    def _impacts(self, term, wanted, source):
+        """
+        The term's accepted passages as (BM25 contribution, passage id) pairs,
+        highest first, and as a passage id -> contribution dict
+        """
+        key = (term, wanted, source)
+        cached = self._impact_cache.get(key)
+        if cached is not None:
+            self._impact_cache.move_to_end(key)
+            return cached
+
+        postings = self._postings[term]
+        count = len(self._lengths)
+        gain = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)) * (K1 + 1)
+        norm_base = K1 * (1 - B)
+        norm_scale = K1 * B / (self._total_length / count)
+        lengths = self._lengths
+        filtered = wanted != (None, None, None) or source is not None
+        contributions = {
+            passage_id: gain * tf / (tf + norm_base + norm_scale * lengths[passage_id])
+            for passage_id, tf in postings.items()
+            if not filtered or self._accepts(passage_id, wanted, source)
+        }
+        cached = sorted(((impact, passage_id) for passage_id, impact in contributions.items()), reverse=True), contributions
+
+        self._impact_cache[key] = cached
+        self._impact_cache_size += len(contributions)
+        while self._impact_cache_size > IMPACT_CACHE_POSTINGS and len(self._impact_cache) > 1:
+            self._impact_cache_size -= len(self._impact_cache.popitem(last=False)[1][1])
+        return cached
+
+    def _score(self, terms, wanted, source, limit):
+        """
+        Per-term contributions by passage, and the scores of the top `limit`
+        profiles, reading postings only until those are settled (Fagin's
+        threshold algorithm)
+        """
+        lists, columns = zip(*(self._impacts(term, wanted, source) for term in terms))
+
+        seen = set()
+        # Min-heap of the best `limit` profiles by their best passage so far
+        top, in_top = [], {}
+        start, block, longest = 0, 8, max(map(len, lists))
+        while start < longest:
+            # No passage after this block can score above the sum of each
+            # list's last impact in it; blocks grow so deep walks stay cheap
+            frontier = 0.0
+            for impacts in lists:
+                rows = impacts[start:start + block]
+                if not rows:
+                    continue
+                frontier += rows[-1][0]
+                for _, passage_id in rows:
+                    if passage_id in seen:
+                        continue
+                    seen.add(passage_id)
+                    score = 0.0
+                    for contributions in columns:
+                        score += contributions.get(passage_id, 0.0)
+
+                    profile_id = self._passages[passage_id][0]
+                    if profile_id in in_top:
+                        if score > in_top[profile_id]:
+                            in_top[profile_id] = score
+                            top = [(value, pid) for pid, value in in_top.items()]
+                            heapq.heapify(top)
+                    elif len(top) < limit:
+                        in_top[profile_id] = score
+                        heapq.heappush(top, (score, profile_id))
+                    elif score > top[0][0]:
+                        del in_top[heapq.heapreplace(top, (score, profile_id))[1]]
+                        in_top[profile_id] = score
+            if len(top) == limit and top[0][0] >= frontier:
+                break
+            start += block
+            block = min(block * 2, 1024)
+        return columns, in_top
+
+    def _top(self, columns, best):
+        """(profile id, score, meta, best passages) of the top profiles, best first"""
+        top = []
+        for profile_id, score in sorted(best.items(), key=lambda item: item[1], reverse=True):
+            _, ids, meta = self._profiles[profile_id]
+            matched = sorted(
+                ((sum(contributions.get(passage_id, 0.0) for contributions in columns), passage_id)
+                 for passage_id in ids if any(passage_id in contributions for contributions in columns)),
+                reverse=True
+            )
+            top.append((profile_id, score, meta, [self._passages[passage_id] for _, passage_id in matched[:MAX_SNIPPETS]]))
+        return top
@@ -0,0 +1,63 @@
+"""
+Section-by-section streaming of MMR analyses (SSE and NDJSON)
+"""
+import json
+import re
+
+# Each "## " heading starts a new section; anything before the first one
+# (the "# " title) is the opening section
+SECTION_RE = re.compile(r'^## ', re.MULTILINE)
+
+
+def iter_sections(text):
+    """
+    Lazily split an analysis on its "## " headings.
+
+    Concatenating the yielded sections gives back the original text. Only the
+    next heading is searched for before each yield, so the first section is
+    available without scanning the rest of the analysis.
+    """
+    start = 0
+    search = SECTION_RE.search
+    match = search(text, 1)
+    while match is not None:
+        yield text[start:match.start()]
+        start = match.start()
+        match = search(text, start + 1)
+    yield text[start:]
+
+
+def sse_event(event, data):
+    """One Server-Sent Events frame with a JSON payload"""
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+def ndjson_line(event, data):
+    """One JSON-lines record; the event name goes in "type" """
+    return json.dumps({'type': event, **data}) + '\n'
+
+
+STREAM_FORMATS = {
+    'sse': ('text/event-stream', sse_event),
+    'ndjson': ('application/x-ndjson', ndjson_line),
+}
+
+
+def stream_analysis(sections, meta, encode):
+    """
+    Frames for a streamed analysis: meta, one per section, then done, or
+    "failed" if producing a section raised. (Not "error": EventSource
+    fires its own error event for connection failures.)
+
+    `sections` may be any iterable of text chunks, including a generator
+    producing the analysis as it goes.
+    """
+    yield encode('meta', meta)
+    count = 0
+    try:
+        for count, content in enumerate(sections, 1):
+            yield encode('section', {'index': count - 1, 'content': content})
+    except Exception as e:
+        yield encode('failed', {'error': str(e)})
+        return
+    yield encode('done', {'sections': count})
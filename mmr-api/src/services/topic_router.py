@@ -0,0 +1,89 @@
+"""
+Compiled keyword routing for MMR topic analyses
+"""
+import re
+
+
+class TopicRouter:
+    """
+    Routes a prompt to the first registered topic whose keywords it mentions.
+
+    Keyword matching is case-insensitive substring matching, the same rule as
+    the original `'keyword' in prompt.lower()` chain. All keywords are compiled
+    into one trie-shaped regex, so a prompt is scanned once and the work per
+    character is bounded by the alphabet rather than by the number of topics.
+    """
+
+    def __init__(self, topics):
+        self.topics = list(topics)
+
+        # keyword -> index of the highest-priority topic it implies
+        rank = {}
+        for index, topic in enumerate(self.topics):
+            for keyword in topic['keywords']:
+                keyword = keyword.lower()
+                if keyword and keyword not in rank:
+                    rank[keyword] = index
+
+        # A match on a keyword also proves every registered keyword inside it,
+        # so fold those priorities in up front
+        self._rank = _fold_contained(rank)
+
+        self._pattern = re.compile(_trie_regex(rank)) if rank else None
+
+    def route(self, prompt):
+        """Return the matching topic dict, or None when no keyword occurs"""
+        if self._pattern is None:
+            return None
+
+        text = prompt.lower()
+        search = self._pattern.search
+        best = None
+        match = search(text)
+        while match is not None:
+            index = self._rank[match.group()]
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+            # Resume one character on rather than after the match so that
+            # overlapping keywords are never skipped
+            match = search(text, match.start() + 1)
+
+        return None if best is None else self.topics[best]
+
+
+def _fold_contained(rank):
+    """Lower each keyword's rank to that of the best keyword it contains"""
+    folded = {}
+    for keyword, best in rank.items():
+        for size in range(1, len(keyword)):
+            for start in range(len(keyword) - size + 1):
+                index = rank.get(keyword[start:start + size])
+                if index is not None and index < best:
+                    best = index
+        folded[keyword] = best
+    return folded
+
+
+def _trie_regex(keywords):
+    """Build a regex alternation whose branches share common prefixes"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = None
+
+    def build(node):
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        group = branches[0] if len(branches) == 1 else '(?:%s)' % '|'.join(branches)
+        if terminal:
+            # Optional and greedy: prefer the longer keyword, fall back to this one
+            return '(?:%s)?' % group
+        return group
+
+    return build(trie)
@@ -0,0 +1,206 @@
+"""
+Registry of topics with dedicated MMR analyses
+
+Topics are checked in registration order: when a prompt mentions keywords
+from several topics, the earliest entry wins.
+"""
+
+NETANYAHU_ANALYSIS = """# **Multi-Modal Reasoning Analysis: Benjamin Netanyahu**
+
+## **🎭 Political Persona Analysis**
+
+### **Public Messaging Patterns**
+- **Security-First Rhetoric**: Consistently frames policies through existential threat lens
+- **Historical Victimization**: References Holocaust and historical persecution to justify current actions
+- **Strongman Positioning**: Projects image of decisive leadership during crises
+- **Media Manipulation**: Strategic use of social media and press conferences for narrative control
+
+### **Policy Implementation Style**
+- **Incremental Expansion**: Gradual settlement expansion while maintaining plausible deniability
+- **Crisis Opportunism**: Uses security incidents to advance controversial policies
+- **Coalition Management**: Maintains power through strategic alliances with far-right parties
+- **International Relations**: Leverages US support while defying international law
+
+## **🧠 Psychological Profile**
+
+### **Leadership Characteristics**
+- **Narcissistic Tendencies**: Requires constant validation and loyalty
+- **Risk Calculation**: Balances domestic political survival with international pressure
+- **Authoritarian Drift**: Increasingly attacks democratic institutions when threatened
+- **Legacy Obsession**: Concerned with historical positioning and personal survival
+
+### **Decision-Making Patterns**
+- **Short-term Focus**: Prioritizes immediate political survival over long-term consequences
+- **Zero-Sum Thinking**: Views Palestinian rights as existential threat to Israeli security
+- **Divide and Conquer**: Exploits divisions within Palestinian leadership and international community
+
+## **⚖️ Intersectional Impact Analysis**
+
+### **On Palestinian Communities**
+- **Systematic Displacement**: Policies that accelerate land confiscation and home demolitions
+- **Economic Strangulation**: Blockade and restriction policies that limit Palestinian development
+- **Cultural Erasure**: Support for policies that deny Palestinian historical narrative
+- **Generational Trauma**: Perpetuation of cycles of violence and displacement
+
+### **On Israeli Society**
+- **Democratic Erosion**: Attacks on judiciary, press freedom, and civil society
+- **Social Polarization**: Deepening divisions between secular/religious, Ashkenazi/Mizrahi communities
+- **Militarization**: Normalization of violence and occupation mindset
+- **Economic Inequality**: Resources diverted to settlements and military while social services suffer
+
+### **On Regional Dynamics**
+- **Normalization Strategy**: Abraham Accords that bypass Palestinian rights
+- **Iranian Escalation**: Policies that increase regional tensions and proxy conflicts
+- **International Law Erosion**: Normalization of occupation and settlement expansion
+
+## **🔍 Multi-Modal Evidence Synthesis**
+
+### **Visual Communication Analysis**
+- **Body Language**: Projects confidence and control in public appearances
+- **Staging**: Carefully choreographed events that reinforce security messaging
+- **Symbolic Choices**: Use of religious and historical symbols to appeal to base
+
+### **Textual Analysis**
+- **Speech Patterns**: Repetitive use of existential threat language
+- **Historical References**: Selective use of Jewish history to justify current policies
+- **Legal Language**: Manipulation of legal frameworks to legitimize illegal actions
+
+### **Behavioral Patterns**
+- **Crisis Response**: Escalates military action during domestic political crises
+- **International Engagement**: Performative diplomacy while continuing harmful policies
+- **Coalition Building**: Maintains power through increasingly extreme alliances
+
+## **🌍 Solidarity-Centered Assessment**
+
+### **Harm Analysis**
+Netanyahu's leadership has **systematically undermined** both Palestinian liberation and genuine Israeli security through:
+- Perpetuation of occupation and apartheid systems
+- Erosion of democratic institutions and rule of law
+- Escalation of regional conflicts and violence
+- Obstruction of peace processes and two-state solutions
+
+### **Resistance and Alternatives**
+**Palestinian and Israeli civil society** continue organizing for:
+- **Joint resistance** to occupation and authoritarianism
+- **Democratic alternatives** that center human rights
+- **Economic justice** that benefits all communities
+- **Truth and reconciliation** processes
+
+## **🎯 Conclusion**
+
+From an **MMR perspective**, Netanyahu represents a **convergence of authoritarianism, settler colonialism, and militarism** that harms both Palestinian and Israeli communities while serving narrow political and economic interests.
+
+**True security and liberation** require leadership that prioritizes **human rights, democratic governance, and justice** over political survival and territorial expansion."""
+
+AL_AHLI_ANALYSIS = """# **Multi-Modal Reasoning Analysis: Al-Ahli Hospital Incident**
+
+## **📊 Information Warfare Analysis**
+
+### **Competing Narratives**
+- **Palestinian Sources**: Israeli airstrike on hospital compound
+- **Israeli Sources**: Failed rocket launch by Palestinian Islamic Jihad
+- **US Intelligence**: Supports Israeli account based on intercepted communications
+- **Independent Analysts**: Mixed assessments based on available evidence
+
+### **Evidence Evaluation Framework**
+
+#### **Physical Evidence**
+- **Crater Analysis**: Size and pattern inconsistent with typical Israeli munitions
+- **Damage Assessment**: Parking lot explosion, hospital building largely intact
+- **Casualty Patterns**: High initial estimates later revised downward
+- **Debris Analysis**: Limited independent forensic investigation
+
+#### **Digital Evidence**
+- **Audio Intercepts**: US/Israeli claims of intercepted Hamas communications
+- **Video Footage**: Multiple angles showing explosion timing and location
+- **Social Media**: Rapid spread of unverified claims and counter-claims
+- **Satellite Imagery**: Pre/post incident analysis of damage patterns
+
+## **🎭 Narrative Construction Analysis**
+
+### **Information Ecosystem Dynamics**
+- **Speed vs. Accuracy**: Pressure for immediate attribution in 24/7 news cycle
+- **Confirmation Bias**: Audiences seeking information that confirms existing beliefs
+- **Source Credibility**: All parties have incentives to shape narrative
+- **Independent Verification**: Limited access for neutral investigators
+
+### **Propaganda Techniques**
+- **Emotional Appeals**: Focus on civilian casualties to generate outrage
+- **Technical Authority**: Use of intelligence claims to establish credibility
+- **Historical Precedent**: References to past incidents to support current claims
+- **Deflection Strategies**: Shifting focus from broader conflict patterns
+
+## **⚖️ Intersectional Impact Analysis**
+
+### **On Palestinian Communities**
+- **Medical Access**: Disruption of healthcare during humanitarian crisis
+- **Psychological Trauma**: Fear and uncertainty about civilian protection
+- **Information Isolation**: Limited ability to verify claims independently
+- **International Solidarity**: Global attention to civilian suffering
+
+### **On Israeli Society**
+- **Security Anxiety**: Reinforcement of existential threat narratives
+- **Moral Injury**: Confrontation with civilian casualty claims
+- **Information Bubbles**: Exposure primarily to state-approved narratives
+- **Democratic Accountability**: Limited public debate about military actions
+
+### **On Global Discourse**
+- **Polarization**: Incident used to reinforce existing political positions
+- **Media Responsibility**: Questions about verification standards and bias
+- **International Law**: Debates about civilian protection and war crimes
+- **Solidarity Movements**: Impact on organizing and public opinion
+
+## **🔍 Multi-Modal Evidence Synthesis**
+
+### **Visual Analysis**
+- **Explosion Footage**: Timing, location, and blast characteristics
+- **Damage Photography**: Extent and pattern of destruction
+- **Casualty Images**: Verification challenges and ethical considerations
+- **Contextual Imagery**: Broader documentation of conflict impacts
+
+### **Audio Analysis**
+- **Intercepted Communications**: Claims and counter-claims about authenticity
+- **Witness Testimony**: First-hand accounts from medical staff and civilians
+- **Official Statements**: Government and military spokesperson claims
+- **Expert Commentary**: Technical analysis from weapons and intelligence experts
+
+### **Textual Analysis**
+- **Official Reports**: Government and military investigation findings
+- **Media Coverage**: Framing and emphasis across different outlets
+- **Social Media**: Viral claims and fact-checking efforts
+- **Academic Analysis**: Scholarly examination of evidence and methodology
+
+## **🌍 Solidarity-Centered Assessment**
+
+### **Harm Reduction Focus**
+Regardless of attribution, the incident highlights:
+- **Civilian Vulnerability**: All parties must prioritize civilian protection
+- **Information Integrity**: Need for independent investigation and verification
+- **Systemic Violence**: Individual incidents occur within broader patterns of harm
+- **Accountability Gaps**: Limited mechanisms for investigating war crimes
+
+### **Justice Framework**
+**True accountability** requires:
+- **Independent Investigation** by neutral international bodies
+- **Civilian Protection** as highest priority for all parties
+- **Information Transparency** and access for journalists and investigators
+- **Systemic Change** addressing root causes of conflict
+
+## **🎯 Conclusion**
+
+From an **MMR perspective**, the Al-Ahli incident demonstrates how **information warfare** becomes central to modern conflicts, with **civilian suffering** instrumentalized for political and military objectives.
+
+**Solidarity demands** focusing on **civilian protection, independent investigation, and systemic change** rather than getting trapped in competing propaganda narratives."""
+
+TOPICS = [
+    {
+        'name': 'netanyahu',
+        'keywords': ['netanyahu'],
+        'analysis': NETANYAHU_ANALYSIS,
+    },
+    {
+        'name': 'al_ahli_hospital',
+        'keywords': ['al ahli', 'hospital'],
+        'analysis': AL_AHLI_ANALYSIS,
+    },
+]
@@ -0,0 +1,35 @@
+"""
+Production WSGI entry point
+
+    cd mmr-api && gunicorn -c gunicorn.conf.py src.wsgi:application
+
+`python src/main.py` still starts the single-process development server.
+"""
+import os
+
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from src.main import app
+from src.services.concurrency import ConcurrencyLimiter
+
+# Behind MMR_PROXY_COUNT reverse proxies, take the client address (which the
+# rate limiter keys on) from X-Forwarded-For, trusting only the entries those
+# proxies appended. Leave it unset when clients connect directly: the header
+# could be forged
+proxy_count = int(os.environ.get('MMR_PROXY_COUNT', 0))
+if proxy_count:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_count)
+
+# Shed load with a 503 once MMR_MAX_CONCURRENT requests are running and
+# MMR_MAX_QUEUE more are waiting; health checks are never shed
+app.wsgi_app = ConcurrencyLimiter(
+    app.wsgi_app,
+    max_concurrent=int(os.environ.get('MMR_MAX_CONCURRENT', 8)),
+    max_queue=int(os.environ.get('MMR_MAX_QUEUE', 16)),
+    queue_timeout=float(os.environ.get('MMR_QUEUE_TIMEOUT', 1.0)),
+    exempt_paths=('/api/health',),
+    allow_origin='*',  # CORS(app) in src/main.py allows every origin
+)
+app.extensions['mmr_concurrency'] = app.wsgi_app
+
+application = app
@@ -0,0 +1,34 @@
+import json
+
+from src.main import app, response_cache
+
+
+def post_batch(prompts):
+    response = app.test_client().post('/api/mmr/query/batch', json={'prompts': prompts})
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_results_in_input_order():
+    prompts = ['netanyahu', 'water rights now', 'netanyahu', 'hospital', 'Water rights now!']
+    client = app.test_client()
+    lines = post_batch(prompts)
+
+    assert [line['index'] for line in lines] == list(range(len(prompts)))
+    for prompt, line in zip(prompts, lines):
+        single = client.post('/api/mmr/query', json={'prompt': prompt}).get_json()
+        assert line['response'] == single['response']
+        assert line['model'] == single['model']
+
+
+def test_duplicates_are_analyzed_once():
+    response_cache.clear()
+    post_batch(['batch dedupe test'] * 50 + ['another batch prompt'] * 50)
+    assert response_cache.stats()['misses'] == 2
+
+
+def test_invalid_batches():
+    client = app.test_client()
+    assert client.post('/api/mmr/query/batch', json={'prompts': 'netanyahu'}).status_code == 400
+    assert client.post('/api/mmr/query/batch', json={'prompts': ['ok', '']}).status_code == 400
+    assert client.post('/api/mmr/query/batch', json={'prompts': ['x'] * 1001}).status_code == 413
@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+
+from src.main import app, query_flights, response_cache
+from src.services import coalesce
+from src.services.coalesce import SingleFlight
+
+
+@pytest.fixture
+def waiting(monkeypatch):
+    """Released once for every caller that starts waiting on another's call"""
+    waiting = threading.Semaphore(0)
+
+    class Done(threading.Event):
+        def wait(self, timeout=None):
+            waiting.release()
+            return super().wait(timeout)
+
+    class Call(coalesce._Call):
+        def __init__(self):
+            super().__init__()
+            self.done = Done()
+
+    monkeypatch.setattr(coalesce, '_Call', Call)
+    return waiting
+
+
+def test_concurrent_calls_share_one_computation(waiting):
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def compute(value):
+        runs.append(value)
+        started.set()
+        release.wait(5)
+        return object()
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do('k', compute, 1)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do('k', compute, 2))) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    for _ in followers:
+        assert waiting.acquire(timeout=5)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert runs == [1]
+    assert len(results) == 6 and all(result is results[0] for result in results)
+    assert flights.stats() == {'calls': 6, 'shared': 5, 'in_flight': 0}
+
+    # Finished calls are not cached
+    assert flights.do('k', lambda: 'again') == 'again'
+
+
+def test_errors_reach_every_waiter_and_are_not_kept(waiting):
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError('boom')
+
+    errors = []
+
+    def call():
+        try:
+            flights.do('k', fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for _ in threads[1:]:
+        assert waiting.acquire(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
+    assert flights.do('k', lambda: 'ok') == 'ok'
+
+
+def test_disabled_runs_every_call():
+    flights = SingleFlight(enabled=False)
+    assert flights.do('k', lambda x: x + 1, 1) == 2
+    assert flights.stats()['calls'] == 0
+
+
+@pytest.fixture
+def client():
+    response_cache.clear()
+    return app.test_client()
+
+
+def test_query_goes_through_coalescing(client):
+    before = query_flights.stats()['calls']
+    response = client.post('/api/mmr/query', json={'prompt': 'coalesced prompt here'})
+    assert response.status_code == 200
+    assert query_flights.stats()['calls'] == before + 1
+    assert client.get('/api/health').get_json()['coalescing']['in_flight'] == 0
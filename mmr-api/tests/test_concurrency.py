@@ -0,0 +1,50 @@
+import threading
+
+from src.services.concurrency import ConcurrencyLimiter
+
+
+def blocking_app(gate, entered=None):
+    def app(environ, start_response):
+        if entered is not None:
+            entered.set()
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        gate.wait(5)
+        return [b'ok']
+    return app
+
+
+def call(app, path='/api/mmr/query'):
+    statuses = []
+    body = app({'PATH_INFO': path}, lambda status, headers: statuses.append((status, dict(headers))))
+    chunks = list(body)
+    if hasattr(body, 'close'):
+        body.close()
+    return statuses[0], chunks
+
+
+def test_sheds_beyond_concurrency_and_queue():
+    gate = threading.Event()
+    entered = threading.Event()
+    limiter = ConcurrencyLimiter(
+        blocking_app(gate, entered), max_concurrent=1, max_queue=0, retry_after=2,
+        exempt_paths=('/api/health',), allow_origin='*',
+    )
+
+    busy = threading.Thread(target=call, args=(limiter,))
+    busy.start()
+    assert entered.wait(5)
+
+    (status, headers), body = call(limiter)
+    assert status.startswith('503')
+    assert headers['Retry-After'] == '2'
+    assert headers['Access-Control-Allow-Origin'] == '*'
+    assert headers['Access-Control-Expose-Headers'] == 'Retry-After'
+    assert limiter.stats()['shed'] == 1
+
+    # Exempt paths bypass the limit
+    gate.set()
+    assert call(limiter, '/api/health')[0][0] == '200 OK'
+    busy.join()
+
+    # The slot is returned once the response is closed
+    assert call(limiter)[0][0] == '200 OK'
@@ -0,0 +1,125 @@
+import io
+import json
+import os
+
+import pytest
+
+from src.main import app
+from src.services.ingest import (
+    Assessment,
+    IngestReport,
+    MalformedProfile,
+    Pillar,
+    Status,
+    ingest,
+    iter_json_profiles,
+    normalize_profile,
+    to_database_row,
+)
+from src.services.profile_data import PROFILE_DATABASES
+
+
+def _database(source):
+    return os.path.join(app.config['MMR_DATA_DIR'], PROFILE_DATABASES[source])
+
+
+def _profile(**overrides):
+    profile = {
+        'name': 'Example',
+        'overall_rating': 'Pass',
+        'pillars': [{'pillar': 'Reject Targeting of Civilians', 'assessment': 'Pass', 'evidence': 'e'}],
+    }
+    profile.update(overrides)
+    return profile
+
+
+def test_both_databases_normalize_to_the_same_enums():
+    report = IngestReport()
+    profiles = list(ingest([_database(source) for source in PROFILE_DATABASES], report))
+
+    assert report.malformed == 0
+    assert len(profiles) == sum(counts['read'] for counts in report.files.values())
+    assert {profile['source'] for profile in profiles} == set(PROFILE_DATABASES)
+    for profile in profiles:
+        assert isinstance(profile['overall'], Status)
+        for pillar in profile['pillars']:
+            assert type(pillar['pillar']) is Pillar
+            assert type(pillar['assessment']) is Assessment
+
+
+def test_spellings_resolve_to_one_member():
+    emoji = normalize_profile({
+        'subject': ' Example ',
+        'overall_alignment': '⚠️ Partial',
+        'pillars': [{'pillar': 'Humanize both peoples', 'assessment': '⚠️ Partial'}],
+    }, 'six_pillar')
+    plain = normalize_profile(_profile(
+        overall_rating='Partial',
+        pillars=[{'pillar': 'Humanize Both Peoples', 'assessment': 'Partial'}],
+    ), 'mmr_complete')
+
+    assert emoji['name'] == plain['name'] == 'Example'
+    assert emoji['overall'] is plain['overall'] is Status.PARTIAL
+    assert emoji['pillars'][0]['pillar'] is plain['pillars'][0]['pillar'] is Pillar.HUMANIZE_BOTH_PEOPLES
+    assert emoji['pillars'][0]['assessment'] is Assessment.PARTIAL
+    assert Assessment.CLEAR_FAIL.status is Status.FAIL
+
+
+@pytest.mark.parametrize('raw, message', [
+    ([], 'expected an object'),
+    (_profile(name=None), 'missing name'),
+    (_profile(overall_rating=''), 'missing overall_rating'),
+    (_profile(overall_rating='banana'), 'unknown overall rating'),
+    (_profile(pillars=[]), 'non-empty'),
+    (_profile(pillars=[{'pillar': 'Unknown', 'assessment': 'Pass'}]), 'unknown pillar'),
+    (_profile(pillars=[{'pillar': 'Reject Eliminationism', 'assessment': 'Maybe'}]), 'unknown assessment'),
+    (_profile(pillars=[{'pillar': 'Reject Eliminationism', 'assessment': 'Pass'}] * 2), 'duplicate'),
+    (_profile(strengths='one'), 'strengths'),
+])
+def test_malformed_profiles(raw, message):
+    with pytest.raises(MalformedProfile, match=message):
+        normalize_profile(raw, 'test')
+
+
+@pytest.mark.parametrize('text', [
+    '[{"a": 1}, {"a": 2}, {"a": "]}"}]',
+    ' {"metadata": {"profiles": []}, "list": [1, {"x": "y"}], "profiles": [{"a": 1}, {"a": 2}, {"a": "]}"}]} ',
+])
+def test_json_layouts_stream_across_chunk_boundaries(text):
+    for chunk_size in (1, 3, 64):
+        profiles = list(iter_json_profiles(io.StringIO(text), chunk_size))
+        assert profiles == [{'a': 1}, {'a': 2}, {'a': ']}'}]
+
+
+def test_numbers_split_across_chunks():
+    text = '[1234567, 2.5e10, true, "x", -0.125]'
+    for chunk_size in range(1, 9):
+        assert list(iter_json_profiles(io.StringIO(text), chunk_size)) == [1234567, 2.5e10, True, 'x', -0.125]
+
+
+def test_malformed_rows_are_reported_and_skipped(tmp_path):
+    good = json.dumps(_profile())
+    lines = tmp_path / 'new.ndjson'
+    lines.write_text('\n'.join([good, '{"name": ', '', json.dumps(_profile(pillars=[])), good]) + '\n')
+    array = tmp_path / 'new.json'
+    array.write_text(f'[{good}, {good}, {{"name": }}, {good}]')
+
+    report = IngestReport()
+    profiles = list(ingest([str(lines), str(array)], report))
+
+    assert len(profiles) == 4
+    assert {profile['source'] for profile in profiles} == {'new'}
+    assert report.files[str(lines)] == {'read': 4, 'ingested': 2, 'malformed': 2}
+    # A syntax error ends a .json file
+    assert report.files[str(array)] == {'read': 3, 'ingested': 2, 'malformed': 1}
+    assert [(error['index'], error['error'].split(':')[0]) for error in report.errors] == [
+        (1, 'invalid JSON'), (3, 'pillars must be a non-empty array'), (2, 'invalid JSON'),
+    ]
+
+
+def test_database_row_round_trip():
+    for profile in ingest([_database('six_pillar')]):
+        row = to_database_row(profile)
+        assert json.loads(json.dumps(row)) == row
+        again = normalize_profile(row, profile['source'])
+        assert again == profile
@@ -0,0 +1,139 @@
+import os
+
+from flask import Flask
+
+from src.main import app
+from src.routes.metrics import metrics_bp
+from src.services.metrics import Metrics, fold_exited_worker
+
+
+def make_app(**kwargs):
+    metrics = Metrics(enabled=True, **kwargs)
+    test_app = Flask(__name__)
+    metrics.init_app(test_app)
+
+    @test_app.route('/work', methods=['POST'])
+    def work():
+        with metrics.stage('work.compute'):
+            sum(range(1000))
+        return {'ok': True}
+
+    @test_app.route('/boom')
+    def boom():
+        return {'error': 'failed'}, 500
+
+    return test_app, metrics
+
+
+def test_prometheus_output():
+    test_app, metrics = make_app()
+    client = test_app.test_client()
+    client.post('/work', json={'x': 1})
+    client.get('/boom')
+
+    text = metrics.render()
+    assert '# TYPE mmr_request_duration_seconds histogram' in text
+    assert 'mmr_request_duration_seconds_count{route="/work",method="POST"} 1' in text
+    assert 'mmr_stage_duration_seconds_count{stage="work.compute"} 1' in text
+    assert 'mmr_requests_total{route="/boom",method="GET",status="500"} 1' in text
+    assert 'mmr_request_errors_total{route="/boom",method="GET"} 1' in text
+    assert 'mmr_request_size_bytes_bucket{route="/work",method="POST",le="+Inf"} 1' in text
+
+
+def test_profiler_keeps_slowest_requests():
+    metrics = Metrics(enabled=True, profile_slowest=2)
+    metrics.profiler.start()
+    for seconds in (0.3, 0.1, 0.5, 0.2):
+        metrics.profiler.begin()
+        metrics.profiler.end(f'GET /{seconds}', seconds)
+    dump = metrics.profiler.dump()
+    headers = [line for line in dump.splitlines() if line.startswith('#')]
+    assert [h.split()[2] for h in headers] == ['/0.5', '/0.3']
+    metrics.profiler.stop()
+
+
+def test_workers_sharing_a_directory_are_merged(tmp_path):
+    app_a, metrics_a = make_app(directory=str(tmp_path), worker_id='a')
+    app_b, metrics_b = make_app(directory=str(tmp_path), worker_id='b')
+    app_a.test_client().post('/work', json={'x': 1})
+    for _ in range(2):
+        app_b.test_client().post('/work', json={'x': 1})
+    metrics_b.flush()
+
+    text = metrics_a.render()
+    assert 'mmr_request_duration_seconds_count{route="/work",method="POST"} 3' in text
+    assert 'mmr_requests_total{route="/work",method="POST",status="200"} 3' in text
+    assert 'mmr_stage_duration_seconds_count{stage="work.compute"} 3' in text
+
+
+def test_exited_workers_are_folded_into_one_file(tmp_path):
+    scraper = Metrics(enabled=True, directory=str(tmp_path), worker_id='scraper')
+    for requests in (2, 1):
+        # Two workers in turn under this process's pid, as after a recycle
+        test_app, metrics = make_app(directory=str(tmp_path), flush_interval=3600)
+        for _ in range(requests):
+            test_app.test_client().post('/work', json={'x': 1})
+        metrics.flush()
+        fold_exited_worker(str(tmp_path), os.getpid())
+        assert sorted(os.listdir(tmp_path)) == ['exited.json']
+
+    text = scraper.render()
+    assert 'mmr_requests_total{route="/work",method="POST",status="200"} 3' in text
+    assert 'mmr_stage_duration_seconds_count{stage="work.compute"} 3' in text
+
+
+def test_profile_label_is_the_route_pattern():
+    test_app, metrics = make_app(profile_slowest=1)
+
+    @test_app.route('/people/<name>')
+    def person(name):
+        return {'name': name}
+
+    test_app.test_client().get('/people/someone?email=someone@example.com')
+    dump = metrics.dump_profiles()
+    assert '# GET /people/<name> 200' in dump
+    assert 'someone' not in dump
+    metrics.profiler.stop()
+
+
+def test_profiler_toggle_needs_token(tmp_path):
+    metrics = Metrics(enabled=True, directory=str(tmp_path), token='secret')
+    test_app = Flask(__name__)
+    metrics.init_app(test_app)
+    test_app.register_blueprint(metrics_bp, url_prefix='/api')
+    client = test_app.test_client()
+
+    assert client.post('/api/metrics/profiler', json={'enabled': True}).status_code == 401
+    wrong = {'Authorization': 'Bearer nope'}
+    assert client.post('/api/metrics/profiler', json={'enabled': True}, headers=wrong).status_code == 401
+    ok = {'Authorization': 'Bearer secret'}
+    response = client.post('/api/metrics/profiler', json={'enabled': True, 'slowest': 3}, headers=ok)
+    assert response.get_json() == {'enabled': True, 'slowest': 3}
+
+    # Another worker follows the switch on its next flush
+    other = Metrics(enabled=True, directory=str(tmp_path), worker_id='other')
+    other.apply_profiler_control()
+    assert other.profiler.enabled and other.profiler.slowest == 3
+    client.post('/api/metrics/profiler', json={'enabled': False}, headers=ok)
+    other.apply_profiler_control()
+    assert not other.profiler.enabled
+
+    assert client.post('/api/metrics/profiler', json=[1], headers=ok).status_code == 400
+    response = client.post('/api/metrics/profiler', json={'enabled': True, 'slowest': True}, headers=ok)
+    assert response.status_code == 400
+
+
+def test_profiler_toggle_disabled_without_token():
+    metrics = Metrics(enabled=True)
+    test_app = Flask(__name__)
+    metrics.init_app(test_app)
+    test_app.register_blueprint(metrics_bp, url_prefix='/api')
+    response = test_app.test_client().post('/api/metrics/profiler', json={'enabled': True})
+    assert response.status_code == 403
+    assert not metrics.profiler.enabled
+
+
+def test_disabled_by_default():
+    client = app.test_client()
+    assert client.get('/api/metrics').status_code == 404
+    assert not app.extensions['mmr_metrics'].enabled
@@ -0,0 +1,130 @@
+import random
+
+from src.main import app
+from src.services.profile_index import ProfileIndex, transform_profile
+
+
+def make_profile(name, category, rating, assessments):
+    return {
+        'subject': name,
+        'role': 'Role',
+        'category': category,
+        'overall_alignment': rating,
+        'pillars': [
+            {'pillar': f'Pillar {i}', 'assessment': assessment, 'evidence': ''}
+            for i, assessment in enumerate(assessments)
+        ],
+    }
+
+
+def test_transform_matches_data_transform_rules():
+    record = transform_profile(make_profile('Ana', 'journalists', '⚠️ Mixed', ['✅ Strong', 'Pass', 'Fail']))
+    assert record['status'] == 'Partial'
+    assert record['sortingScore'] == 2 * 10000 + 2 - 2
+    assert [p['status'] for p in record['pillars']] == ['Strong', 'Pass', 'Fail']
+
+
+def test_filters_sort_and_cursor_pagination():
+    profiles = [
+        make_profile(f'Person {i}', 'a' if i % 2 else 'b', ['Pass', 'Partial', 'Fail'][i % 3], ['Pass'] * (i % 4))
+        for i in range(30)
+    ]
+    index = ProfileIndex(('test', p) for p in profiles)
+
+    expected = sorted(
+        (r for r in index.profiles if r['category'] == 'a' and r['pillars']),
+        key=lambda r: -r['sortingScore']
+    )
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = index.query(category='a', pillar='pillar 0', assessment='pass', cursor=cursor, limit=4)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert [r['id'] for r in seen] == [r['id'] for r in expected]
+
+    page, _ = index.query(name='person 1', sort='low-to-high', limit=100)
+    assert {r['name'] for r in page} == {'Person 1'} | {f'Person {i}' for i in range(10, 20)}
+    scores = [r['sortingScore'] for r in page]
+    assert scores == sorted(scores)
+
+
+def test_profiles_endpoint():
+    client = app.test_client()
+    first = client.get('/api/profiles?limit=5').get_json()
+    assert first['count'] == 5
+    second = client.get(f"/api/profiles?limit=5&cursor={first['next_cursor']}").get_json()
+    assert not {p['id'] for p in first['profiles']} & {p['id'] for p in second['profiles']}
+
+    profile = first['profiles'][0]
+    assert client.get(f"/api/profiles/{profile['id']}").get_json() == profile
+    assert client.get('/api/profiles/missing').status_code == 404
+    assert client.get('/api/profiles?sort=random').status_code == 400
+
+
+def test_duplicates_assessment_and_status_filters():
+    profiles = [
+        ('old', make_profile('Ana B.', 'a', 'Pass', ['Fail'])),
+        ('new', make_profile('ana b', 'a', 'Pass', ['✅ Pass'])),
+        ('old', make_profile('Carl', 'a', '❌ Fail', ['⚠️ Partial'])),
+    ]
+    index = ProfileIndex(profiles, source_priority=('new',))
+
+    page, _ = index.query(limit=10)
+    assert sorted(r['id'] for r in page) == ['new:ana-b', 'old:carl']
+    assert len(index.query(source='old', limit=10)[0]) == 2
+
+    assert [r['id'] for r in index.query(assessment='partial', limit=10)[0]] == ['old:carl']
+    assert [r['id'] for r in index.query(assessment='✅ Pass', limit=10)[0]] == ['new:ana-b']
+    assert [r['id'] for r in index.query(status='fail', limit=10)[0]] == ['old:carl']
+
+
+def test_profiles_endpoint_rejects_negative_cursor():
+    client = app.test_client()
+    assert client.get('/api/profiles?cursor=-5&limit=100').status_code == 400
+
+
+def test_category_spellings_share_the_navigation_id():
+    profiles = [
+        ('new', make_profile('Ana', 'Israeli Politicians', 'Pass', ['Pass'])),
+        ('old', make_profile('Ben', 'israeli-politicians', 'Pass', ['Pass'])),
+        ('new', make_profile('Cleo', 'Journalists & Media Figures', 'Pass', ['Pass'])),
+        ('new', make_profile('Dan', 'Palestinian Authority Officials', 'Pass', ['Pass'])),
+    ]
+    index = ProfileIndex(profiles, category_ids=['journalists', 'israeli-politicians', 'palestinian-authority'])
+    for category in ('israeli-politicians', 'Israeli Politicians'):
+        assert sorted(r['name'] for r in index.query(category=category)[0]) == ['Ana', 'Ben']
+    assert [r['name'] for r in index.query(category='journalists')[0]] == ['Cleo']
+    assert [r['name'] for r in index.query(category='palestinian-authority')[0]] == ['Dan']
+
+    client = app.test_client()
+    for slug in ('israeli-politicians', 'hamas-officials', 'ngo-leaders', 'peace-advocates', 'us-politicians',
+                 'palestinian-authority'):
+        assert client.get(f'/api/profiles?category={slug}').get_json()['count'] > 0
+
+
+def test_intersections_match_a_scan():
+    rng = random.Random(5)
+    profiles = [
+        (rng.choice(['old', 'new']), make_profile(
+            f'Person {rng.randrange(300)}', rng.choice('abc'), rng.choice(['Pass', 'Partial', 'Fail']),
+            [rng.choice(['Pass', 'Partial', 'Fail']) for _ in range(3)],
+        ))
+        for _ in range(400)
+    ]
+    index = ProfileIndex(profiles, source_priority=('new',))
+    filters = {'category': 'b', 'status': 'Pass', 'pillar': 'Pillar 1', 'assessment': 'Fail'}
+    seen, cursor = [], None
+    while True:
+        page, cursor = index.query(cursor=cursor, limit=7, **filters)
+        seen.extend(r['id'] for r in page)
+        if cursor is None:
+            break
+    listed = {r['id'] for r in index.query(limit=1000)[0]}
+    expected = [
+        r['id'] for r in sorted(index.profiles, key=lambda r: -r['sortingScore'])
+        if r['id'] in listed and r['category'] == 'b' and r['status'] == 'Pass'
+        and r['pillars'][1]['status'] == 'Fail'
+    ]
+    assert seen == expected
@@ -0,0 +1,148 @@
+import pytest
+from flask import Flask
+from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from src.services.rate_limit import MemoryStore, RateLimiter, SQLiteStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, clock, tmp_path):
+    if request.param == 'memory':
+        return MemoryStore(clock=clock)
+    return SQLiteStore(str(tmp_path / 'buckets.db'), clock=clock)
+
+
+def test_token_bucket(store, clock):
+    # 2 tokens per second, bursts of 3
+    assert [store.take('a', 2, 3) for _ in range(3)] == [0, 0, 0]
+    assert store.take('a', 2, 3) == pytest.approx(0.5)
+    # Other clients have their own bucket
+    assert store.take('b', 2, 3) == 0
+
+    clock.now += 0.5
+    assert store.take('a', 2, 3) == 0
+    assert store.take('a', 2, 3) == pytest.approx(0.5)
+
+    # Refills stop at the burst size
+    clock.now += 60
+    assert [store.take('a', 2, 3) for _ in range(4)][-1] > 0
+
+
+def test_cost_takes_several_tokens(store, clock):
+    assert store.take('a', 1, 5, cost=4) == 0
+    assert store.take('a', 1, 5, cost=2) == pytest.approx(1)
+    clock.now += 1
+    assert store.take('a', 1, 5, cost=2) == 0
+
+
+def test_sqlite_store_is_shared(clock, tmp_path):
+    path = str(tmp_path / 'buckets.db')
+    first, second = SQLiteStore(path, clock=clock), SQLiteStore(path, clock=clock)
+    assert first.take('a', 1, 2) == 0
+    assert second.take('a', 1, 2) == 0
+    assert first.take('a', 1, 2) > 0
+
+
+def test_memory_store_sweeps_idle_clients(clock):
+    store = MemoryStore(max_keys=10, clock=clock)
+    for n in range(10):
+        store.take(n, 1, 1)
+    clock.now += 5
+    store.take('new', 1, 1)
+    assert len(store) == 1
+
+
+def make_app(limiter):
+    test_app = Flask(__name__)
+    CORS(test_app, expose_headers=['Retry-After'])
+    limiter.init_app(test_app)
+
+    @test_app.route('/mmr', endpoint='mmr_query', methods=['POST'])
+    def mmr_query():
+        return {'ok': True}
+
+    @test_app.route('/batch', endpoint='mmr_query_batch', methods=['POST'])
+    def mmr_query_batch():
+        return {'ok': True}
+
+    @test_app.route('/health')
+    def health():
+        return {'ok': True}
+
+    return test_app.test_client()
+
+
+def test_429_with_retry_after(clock):
+    limiter = RateLimiter(MemoryStore(clock=clock), rate=0.5, burst=2, enabled=True)
+    client = make_app(limiter)
+
+    assert [client.post('/mmr').status_code for _ in range(2)] == [200, 200]
+    response = client.post('/mmr')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '2'
+    assert 'Rate limit exceeded' in response.get_json()['error']
+    assert limiter.stats()['limited'] == 1
+
+    # Other clients and unlimited endpoints are unaffected
+    assert client.post('/mmr', environ_base={'REMOTE_ADDR': '10.0.0.2'}).status_code == 200
+    assert client.get('/health').status_code == 200
+
+    clock.now += 2
+    assert client.post('/mmr').status_code == 200
+
+
+def test_preflight_is_not_charged(clock):
+    client = make_app(RateLimiter(MemoryStore(clock=clock), rate=0.5, burst=2, enabled=True))
+    preflight = {'Origin': 'https://example.com', 'Access-Control-Request-Method': 'POST'}
+    assert [client.options('/mmr', headers=preflight).status_code for _ in range(2)] == [200, 200]
+    assert [client.post('/mmr').status_code for _ in range(2)] == [200, 200]
+
+    response = client.post('/mmr', headers={'Origin': 'https://example.com'})
+    assert response.status_code == 429
+    assert 'Retry-After' in response.headers['Access-Control-Expose-Headers']
+
+
+def test_batch_costs_one_token_per_distinct_prompt(clock):
+    limiter = RateLimiter(MemoryStore(clock=clock), rate=1, burst=4, enabled=True)
+    client = make_app(limiter)
+    assert client.post('/batch', json={'prompts': ['a', 'b', 'a', 'c']}).status_code == 200
+    assert client.post('/batch', json={'prompts': ['a', 'b']}).status_code == 429
+    assert client.post('/mmr').status_code == 200
+
+    # More distinct prompts than the burst could never go through
+    response = client.post('/batch', json={'prompts': list('abcde')}, environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert response.status_code == 413
+
+
+def test_clients_behind_a_proxy_get_their_own_bucket(clock):
+    test_app = make_app(RateLimiter(MemoryStore(clock=clock), rate=0.5, burst=1, enabled=True)).application
+    test_app.wsgi_app = ProxyFix(test_app.wsgi_app, x_for=1)
+    client = test_app.test_client()
+    for address in ('203.0.113.1', '203.0.113.2'):
+        assert client.post('/mmr', headers={'X-Forwarded-For': address}).status_code == 200
+    assert client.post('/mmr', headers={'X-Forwarded-For': '203.0.113.1'}).status_code == 429
+
+
+def test_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv('MMR_RATE_LIMIT', raising=False)
+    assert not RateLimiter.from_env().enabled
+
+    monkeypatch.setenv('MMR_RATE_LIMIT', '5')
+    monkeypatch.setenv('MMR_RATE_LIMIT_STORE', str(tmp_path / 'buckets.db'))
+    limiter = RateLimiter.from_env()
+    assert limiter.enabled and limiter.burst == 10
+    assert isinstance(limiter.store, SQLiteStore)
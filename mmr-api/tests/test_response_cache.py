@@ -0,0 +1,67 @@
+import gzip
+
+import pytest
+
+from src.main import app, response_cache
+
+
+@pytest.fixture
+def client():
+    response_cache.clear()
+    return app.test_client()
+
+
+def test_repeat_query_is_served_from_cache(client):
+    first = client.post('/api/mmr/query', json={'prompt': 'Netanyahu'})
+    second = client.post('/api/mmr/query', json={'prompt': 'tell me about NETANYAHU'})
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert 'Multi-Modal Reasoning Analysis: Benjamin Netanyahu' in first.get_json()['response']
+
+    stats = client.get('/api/health').get_json()['response_cache']
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_conditional_get_returns_304(client):
+    etag = client.post('/api/mmr/query', json={'prompt': 'hospital'}).headers['ETag']
+    response = client.get('/api/mmr/query?prompt=hospital', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    # 304 is only defined for GET and HEAD
+    response = client.post('/api/mmr/query', json={'prompt': 'hospital'}, headers={'If-None-Match': etag})
+    assert response.status_code == 412
+
+
+def test_etag_does_not_depend_on_the_timestamp(client, monkeypatch):
+    first = client.get('/api/mmr/query?prompt=water rights today')
+    response_cache.clear()
+    monkeypatch.setattr('time.time', lambda: 0.0)
+    second = client.get('/api/mmr/query?prompt=water rights today')
+    assert first.get_json()['timestamp'] != second.get_json()['timestamp']
+    assert first.headers['ETag'] == second.headers['ETag']
+
+
+def test_gzip_variant(client):
+    plain = client.post('/api/mmr/query', json={'prompt': 'hospital'})
+    compressed = client.post('/api/mmr/query', json={'prompt': 'hospital'}, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+
+    # Different bytes, so the shared validator must be weak
+    assert plain.headers['ETag'] == compressed.headers['ETag']
+    assert plain.headers['ETag'].startswith('W/"')
+
+
+def test_fallback_entries_are_keyed_by_title_and_bounded(client, monkeypatch):
+    monkeypatch.setattr(response_cache, 'maxsize', 2)
+    one = client.post('/api/mmr/query', json={'prompt': 'Water rights today, and more'}).get_json()
+    two = client.post('/api/mmr/query', json={'prompt': 'water RIGHTS today'}).get_json()
+    assert one == two
+    assert 'Water Rights Today' in one['response']
+
+    client.post('/api/mmr/query', json={'prompt': 'second topic'})
+    client.post('/api/mmr/query', json={'prompt': 'third topic'})
+    assert response_cache.stats()['lru_entries'] == 2
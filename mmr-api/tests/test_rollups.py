@@ -0,0 +1,95 @@
+import json
+import os
+import random
+
+from src.main import app
+from src.services.ingest import normalize_profile, to_database_row
+from src.services.rollups import RollupStats
+from src.services.scoring import MMRScorer
+
+PILLARS = ['Reject Targeting of Civilians', 'Humanize Both Peoples', 'Vision for Dignity & Peace', 'Reject Eliminationism']
+ASSESSMENTS = ['Strong Pass', 'Pass', 'Partial', 'Mixed', 'Fail']
+
+
+def make_scorer():
+    return MMRScorer.from_file(os.path.join(app.config['MMR_DATA_DIR'], 'mmr_v8_rules.json'))
+
+
+def test_random_edits_stay_consistent_with_full_recompute():
+    rng = random.Random(11)
+    rollups = RollupStats(make_scorer())
+    ids = []
+    for step in range(500):
+        action = rng.random()
+        if action < 0.3 or not ids:
+            profile_id = f'p{step}'
+            ids.append(profile_id)
+            rollups.add_profile(profile_id, {
+                'category': rng.choice(['a', 'b', 'c']),
+                'overall_rating': rng.choice(['Pass', 'Partial', 'Failing']),
+                'pillars': [{'pillar': p, 'assessment': rng.choice(ASSESSMENTS)} for p in PILLARS],
+            })
+        elif action < 0.5:
+            rollups.remove_profile(ids.pop(rng.randrange(len(ids))))
+        elif action < 0.9:
+            rollups.set_pillar_assessment(rng.choice(ids), rng.choice(PILLARS), rng.choice(ASSESSMENTS))
+        else:
+            rollups.remove_pillar(rng.choice(ids), rng.choice(PILLARS))
+        assert rollups.verify() == []
+
+    stats = rollups.snapshot()
+    assert stats['overall_performance']['total_figures'] == len(ids)
+    assert sum(c['total'] for c in stats['by_category'].values()) == len(ids)
+
+
+def test_pillar_edit_moves_outcome_counts():
+    rollups = RollupStats(make_scorer())
+    rollups.add_profile('x', {
+        'category': 'a',
+        'overall_rating': 'Pass',
+        'pillars': [{'pillar': p, 'assessment': 'Strong Pass'} for p in PILLARS + ['Use Verified, Truthful Sources', 'Other']],
+    })
+    assert rollups.snapshot()['mmr_v8']['overall']['pass'] == 1
+
+    rollups.set_pillar_assessment('x', 'Humanize Both Peoples', 'Fail')
+    v8 = rollups.snapshot()['mmr_v8']['by_category']['a']
+    assert (v8['pass'], v8['fail'], v8['level']) == (0, 1, 'Needs Improvement')
+
+    rollups.remove_profile('x')
+    assert rollups.snapshot()['by_category'] == {}
+
+
+def test_unscored_outcomes_stay_out_of_v8_totals():
+    rollups = RollupStats(make_scorer())
+    rollups.add_profile('x', {'category': 'a', 'overall_rating': 'Pass', 'pillars': []})
+    v8 = rollups.snapshot()['mmr_v8']['overall']
+    assert (v8['total'], v8['unscored'], v8['level']) == (0, 1, 'No Data')
+
+
+def test_canonical_rows_score_like_the_rules_spelling():
+    raw = {
+        'name': 'x',
+        'category': 'a',
+        'overall_rating': '✅ Full Pass',
+        'pillars': [{'pillar': p.upper(), 'assessment': '✅ Strong Pass'} for p in PILLARS]
+        + [{'pillar': 'Use Verified, Truthful Sources', 'assessment': '✅ Strong Pass'}],
+    }
+    rollups = RollupStats(make_scorer())
+    rollups.add_profile('raw', raw)
+    rollups.add_profile('canonical', to_database_row(normalize_profile(raw, 'test')))
+    v8 = rollups.snapshot()['mmr_v8']['overall']
+    # Only the canonical row's assessments are ones the v8 rules know
+    assert (v8['almostPass'], v8['total'], v8['unscored']) == (1, 1, 1)
+
+
+def test_stats_endpoints():
+    client = app.test_client()
+    stats = client.get('/api/stats').get_json()
+    # Counted from the hand-maintained database only, one row per person
+    with open(os.path.join(app.config['MMR_DATA_DIR'], 'mmr_complete_database.json'), encoding='utf-8') as f:
+        profiles = json.load(f)['profiles']
+    assert stats['overall_performance']['total_figures'] == len(profiles)
+    assert sum(c['total'] for c in stats['by_category'].values()) == len(profiles)
+    assert set(stats['by_category']) == {p['category'] for p in profiles}
+    assert stats['mmr_v8']['overall']['unscored'] == 0
+    assert client.get('/api/stats/consistency').get_json()['consistent'] is True
@@ -0,0 +1,101 @@
+import json
+import os
+import random
+import shutil
+import subprocess
+
+import pytest
+
+from src.main import app
+from src.services.scoring import MMRScorer
+
+DATA_DIR = app.config['MMR_DATA_DIR']
+JS_MODULE = os.path.join(DATA_DIR, '..', 'utils', 'mmrV8Calculations.js')
+
+# Lets node import the frontend module as-is: it imports JSON without attributes
+NODE_HOOKS = """
+export async function load(url, context, nextLoad) {
+  if (url.endsWith('.json')) {
+    return nextLoad(url, { ...context, importAttributes: { type: 'json' } });
+  }
+  return nextLoad(url, context);
+}
+"""
+
+NODE_RUNNER = """
+import { register } from 'node:module';
+import { readFileSync } from 'node:fs';
+import { pathToFileURL } from 'node:url';
+register('./hooks.mjs', import.meta.url);
+const { computeMMROutcome } = await import(pathToFileURL(process.argv[2]).href);
+const profiles = JSON.parse(readFileSync(0, 'utf8'));
+process.stdout.write(JSON.stringify(profiles.map(p => computeMMROutcome(p))));
+"""
+
+
+def load_profiles():
+    with open(os.path.join(DATA_DIR, 'mmr_complete_database.json'), encoding='utf-8') as f:
+        return json.load(f)['profiles']
+
+
+def synthetic_profiles(rules, count, seed=3):
+    rng = random.Random(seed)
+    assessments = ['Strong Pass', 'Pass', 'Partial', 'Mixed', 'Fail', 'Clear Fail', 'Weak']
+    pillars = rules['priority_pillars'] + ['Reject Eliminationism', 'Use Verified, Truthful Sources', 'Other']
+    reflections = ['', 'Bridge-building leadership.', 'Eliminationist rhetoric.', 'ELIMINATIONISM']
+    return [
+        {
+            'pillars': [
+                {'pillar': rng.choice(pillars), 'assessment': rng.choice(assessments)}
+                for _ in range(rng.randint(0, 8))
+            ],
+            'reflection': rng.choice(reflections),
+        }
+        for _ in range(count)
+    ]
+
+
+def js_outcomes(profiles, tmp_path):
+    (tmp_path / 'hooks.mjs').write_text(NODE_HOOKS)
+    (tmp_path / 'run.mjs').write_text(NODE_RUNNER)
+    result = subprocess.run(
+        ['node', str(tmp_path / 'run.mjs'), os.path.abspath(JS_MODULE)],
+        input=json.dumps(profiles), capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is required for JS parity')
+def test_parity_with_js_compute_mmr_outcome(tmp_path):
+    scorer = MMRScorer.from_file(os.path.join(DATA_DIR, 'mmr_v8_rules.json'))
+    with open(os.path.join(DATA_DIR, 'mmr_v8_rules.json'), encoding='utf-8') as f:
+        rules = json.load(f)
+
+    profiles = load_profiles() + synthetic_profiles(rules, 2000)
+    assert scorer.score_batch(profiles) == js_outcomes(profiles, tmp_path)
+
+
+def test_score_endpoints():
+    client = app.test_client()
+    profile = load_profiles()[0]
+
+    single = client.post('/api/mmr/score', json=profile).get_json()
+    assert single == {'outcome': 'High Positive Indicators', 'category': 'Pass'}
+
+    batch = client.post('/api/mmr/score/batch', json={'profiles': [profile] * 3}).get_json()
+    assert batch['count'] == 3
+    assert batch['outcomes'] == [single] * 3
+
+    assert client.post('/api/mmr/score', json={'name': 'no pillars'}).status_code == 400
+    assert client.post('/api/mmr/score/batch', json={'profiles': [{}]}).status_code == 400
+    assert client.post('/api/mmr/score/batch', json=[profile]).status_code == 400
+
+    malformed = [
+        {'pillars': [1]},
+        {'pillars': [{'pillar': ['a'], 'assessment': 'Pass'}]},
+        {'pillars': [{'pillar': 'Reject Eliminationism', 'assessment': {'x': 1}}]},
+        {'pillars': [], 'reflection': 5},
+    ]
+    for bad in malformed:
+        assert client.post('/api/mmr/score', json=bad).status_code == 400
+        assert client.post('/api/mmr/score/batch', json={'profiles': [profile, bad]}).status_code == 400
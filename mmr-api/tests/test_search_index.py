@@ -0,0 +1,95 @@
+import random
+
+from src.main import app
+from src.services.search_index import SearchIndex, analyze, highlight
+
+WORDS = ('civilian settlement violence hospital ceasefire dialogue hostage occupation rights '
+         'incitement coexistence dignity refugees negotiation blockade militia').split()
+PILLARS = ['Reject Targeting of Civilians', 'Humanize Both Peoples', 'Reject Eliminationism']
+
+
+def make_profile(rng, n):
+    return {
+        'subject': f'Person {n}',
+        'category': rng.choice(['a', 'b']),
+        'source_context': ' '.join(rng.choices(WORDS, k=rng.randint(3, 12))),
+        'pillars': [
+            {'pillar': p, 'assessment': rng.choice(['Pass', 'Partial', 'Fail']),
+             'evidence': ' '.join(rng.choices(WORDS, k=rng.randint(3, 20)))}
+            for p in PILLARS
+        ],
+    }
+
+
+def ranking(results):
+    return [(r['id'], r['score']) for r in results]
+
+
+def test_stemming_and_stopwords():
+    assert analyze('Violates the violated, violating!') == ['violat'] * 3
+    assert analyze('Families of the family') == analyze('family family')
+    assert analyze('Café') == analyze('cafe')
+
+
+def test_pruned_top_k_matches_exhaustive_ranking():
+    rng = random.Random(3)
+    index = SearchIndex()
+    for n in range(300):
+        index.add_profile(f'p{n}', make_profile(rng, n))
+    for _ in range(50):
+        query = ' '.join(rng.sample(WORDS, rng.randint(1, 4)))
+        exhaustive = index.search(query, limit=300)
+        top = index.search(query, limit=5)
+        assert [score for _, score in ranking(top)] == [score for _, score in ranking(exhaustive)[:5]]
+
+
+def test_rebuild_only_touches_changed_profiles():
+    rng = random.Random(5)
+    profiles = {f'p{n}': make_profile(rng, n) for n in range(50)}
+    index = SearchIndex()
+    assert index.rebuild((pid, 'src', p) for pid, p in profiles.items())['added'] == 50
+
+    profiles['p1'] = make_profile(rng, 1)
+    profiles['p50'] = make_profile(rng, 50)
+    del profiles['p2']
+    counts = index.rebuild((pid, 'src', p) for pid, p in profiles.items())
+    assert counts == {'added': 1, 'updated': 1, 'removed': 1, 'unchanged': 48}
+
+    fresh = SearchIndex()
+    fresh.rebuild((pid, 'src', p) for pid, p in profiles.items())
+    for query in ('hospital ceasefire', 'dignity', 'militia refugees rights'):
+        assert ranking(index.search(query, limit=20)) == ranking(fresh.search(query, limit=20))
+
+
+def test_pillar_filters():
+    index = SearchIndex()
+    index.add_profile('x', {'subject': 'X', 'pillars': [
+        {'pillar': 'Reject Eliminationism', 'assessment': '❌ Fail', 'evidence': 'Calls for expulsion.'},
+        {'pillar': 'Humanize Both Peoples', 'assessment': '✅ Pass', 'evidence': 'Opposes expulsion.'},
+    ]})
+    [result] = index.search('expulsion', pillar='reject eliminationism')
+    assert [s['pillar'] for s in result['snippets']] == ['Reject Eliminationism']
+    assert index.search('expulsion', pillar='Humanize Both Peoples', assessment='fail') == []
+    # Any spelling of an assessment matches, as in /api/profiles
+    for spelling in ('✅ Pass', 'Strong Pass', 'pass'):
+        [result] = index.search('expulsion', assessment=spelling)
+        assert [s['pillar'] for s in result['snippets']] == ['Humanize Both Peoples']
+    [result] = index.search('expulsion', assessment='Clear Fail')
+    assert [s['pillar'] for s in result['snippets']] == ['Reject Eliminationism']
+    assert index.search('expulsion', field='reflection') == []
+
+
+def test_highlight_escapes_and_marks():
+    assert highlight('Hamas <b>attacks</b> civilians', {'civilian'}) == \
+        'Hamas &lt;b&gt;attacks&lt;/b&gt; <mark>civilians</mark>'
+    snippet = highlight('word ' * 100 + 'ceasefire talks ' + 'word ' * 100, {'ceasefir'})
+    assert snippet.startswith('…') and snippet.endswith('…') and '<mark>ceasefire</mark>' in snippet
+
+
+def test_search_endpoint():
+    client = app.test_client()
+    body = client.get('/api/search?q=settlement+expansion&limit=3').get_json()
+    assert body['count'] == 3
+    assert all('<mark>' in r['snippets'][0]['text'] for r in body['results'])
+    assert client.get('/api/search').status_code == 400
+    assert client.get('/api/search?q=x&field=name').status_code == 400
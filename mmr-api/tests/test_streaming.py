@@ -0,0 +1,79 @@
+import json
+
+import src.main
+from src.main import app, perform_mmr_analysis
+from src.services.streaming import iter_sections, sse_event, stream_analysis
+
+
+def parse_sse(body):
+    events = []
+    for frame in body.strip().split('\n\n'):
+        event, data = frame.split('\n')
+        events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+def test_sections_round_trip():
+    text = perform_mmr_analysis('netanyahu')
+    sections = list(iter_sections(text))
+    assert ''.join(sections) == text
+    assert sections[0].startswith('# ')
+    assert all(section.startswith('## ') for section in sections[1:])
+    assert list(iter_sections('no headings')) == ['no headings']
+
+
+def test_sse_stream():
+    client = app.test_client()
+    response = client.post('/api/mmr/query/stream', json={'prompt': 'hospital'})
+    assert response.mimetype == 'text/event-stream'
+
+    events = parse_sse(response.get_data(as_text=True))
+    assert events[0][0] == 'meta'
+    assert events[-1] == ('done', {'sections': len(events) - 2})
+    content = ''.join(data['content'] for event, data in events if event == 'section')
+    assert content == perform_mmr_analysis('hospital')
+
+
+def test_ndjson_stream_over_get():
+    client = app.test_client()
+    response = client.get('/api/mmr/query/stream?format=ndjson&prompt=water+rights')
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r['type'] for r in records[:2]] == ['meta', 'section']
+    assert ''.join(r['content'] for r in records if r['type'] == 'section') == perform_mmr_analysis('water rights')
+
+
+def test_sections_are_built_as_they_are_sent(monkeypatch):
+    built = []
+
+    def sections(topic):
+        for n in range(3):
+            built.append(n)
+            yield f'## {n}\n'
+
+    monkeypatch.setattr(src.main, 'default_mmr_sections', sections)
+    response = app.test_client().get('/api/mmr/query/stream?format=ndjson&prompt=water+rights', buffered=False)
+    frames = iter(response.response)
+    assert json.loads(next(frames))['type'] == 'meta' and built == []
+    assert json.loads(next(frames))['content'] == '## 0\n' and built == [0]
+    assert [json.loads(frame)['type'] for frame in frames] == ['section', 'section', 'done']
+    response.close()
+
+
+def test_stream_validation_and_old_contract():
+    client = app.test_client()
+    assert client.post('/api/mmr/query/stream', json={}).status_code == 400
+    for body in (['hospital'], {'prompt': 5}):
+        assert client.post('/api/mmr/query/stream', json=body).status_code == 400
+        assert client.post('/api/mmr/query', json=body).status_code == 400
+    assert client.post('/api/mmr/query/batch', json=['hospital']).status_code == 400
+    assert client.get('/api/mmr/query/stream?prompt=x&format=xml').status_code == 400
+    assert 'response' in client.post('/api/mmr/query', json={'prompt': 'hospital'}).get_json()
+
+
+def test_failure_event_does_not_shadow_eventsource_error():
+    def sections():
+        yield '# Title\n'
+        raise RuntimeError('model went away')
+
+    frames = list(stream_analysis(sections(), {}, sse_event))
+    assert frames[-1].startswith('event: failed\n')
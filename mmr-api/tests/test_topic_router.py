@@ -0,0 +1,56 @@
+import random
+import string
+
+from src.services.topic_router import TopicRouter
+from src.services.topics import TOPICS
+
+
+def linear_route(topics, prompt):
+    """The original if/elif chain, generalised to a topic list"""
+    prompt_lower = prompt.lower()
+    for topic in topics:
+        if any(keyword.lower() in prompt_lower for keyword in topic['keywords']):
+            return topic
+    return None
+
+
+def test_routes_registered_topics():
+    router = TopicRouter(TOPICS)
+    assert router.route('Analyze Netanyahu')['name'] == 'netanyahu'
+    assert router.route('What happened at Al Ahli?')['name'] == 'al_ahli_hospital'
+    assert router.route('the HOSPITAL strike')['name'] == 'al_ahli_hospital'
+    assert router.route('water rights in the west bank') is None
+
+
+def test_registration_order_wins_regardless_of_position():
+    router = TopicRouter(TOPICS)
+    assert router.route('hospital statement by netanyahu')['name'] == 'netanyahu'
+
+
+def test_overlapping_and_contained_keywords():
+    topics = [
+        {'name': 'inner', 'keywords': ['ahli']},
+        {'name': 'outer', 'keywords': ['al ahli hospital']},
+        {'name': 'overlap', 'keywords': ['bc']},
+        {'name': 'prefix', 'keywords': ['ab']},
+    ]
+    router = TopicRouter(topics)
+    assert router.route('al ahli hospital')['name'] == 'inner'
+    assert router.route('abc')['name'] == 'overlap'
+
+
+def test_matches_linear_chain_on_random_registries():
+    rng = random.Random(7)
+    for _ in range(50):
+        topics = [
+            {'name': str(i), 'keywords': [''.join(rng.choice('abc') for _ in range(rng.randint(1, 4)))]}
+            for i in range(rng.randint(1, 12))
+        ]
+        router = TopicRouter(topics)
+        for _ in range(20):
+            prompt = ''.join(rng.choice('abc ' + string.ascii_uppercase[:3]) for _ in range(rng.randint(0, 30)))
+            assert router.route(prompt) is linear_route(topics, prompt)
+
+
+def test_empty_registry():
+    assert TopicRouter([]).route('anything') is None
@@ -0,0 +1,69 @@
+import pytest
+
+from src.main import app
+from src.models.user import User, db
+
+
+@pytest.fixture(autouse=True)
+def users_token(monkeypatch):
+    monkeypatch.setitem(app.config, 'MMR_USERS_TOKEN', 'secret')
+    with app.app_context():
+        db.session.query(User).delete()
+        db.session.commit()
+
+
+def make_client(token='secret'):
+    client = app.test_client()
+    if token is not None:
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    return client
+
+
+def test_engine_uses_wal():
+    with app.app_context():
+        assert db.session.execute(db.text('PRAGMA journal_mode')).scalar() == 'wal'
+
+
+def test_batch_insert_and_keyset_pagination():
+    client = make_client()
+    rows = [{'username': f'user{i}', 'email': f'user{i}@example.org'} for i in range(25)]
+    response = client.post('/api/users/batch', json=rows)
+    assert response.status_code == 201
+    assert response.get_json()['created'] == 25
+
+    seen, url = [], '/api/users?limit=10'
+    while url:
+        page = client.get(url)
+        seen.extend(user['username'] for user in page.get_json())
+        link = page.headers.get('Link')
+        url = link[1:link.index('>')] if link else None
+    assert seen == [row['username'] for row in rows]
+
+
+def test_batch_is_all_or_nothing():
+    client = make_client()
+    client.post('/api/users', json={'username': 'taken', 'email': 'taken@example.org'})
+    rows = [{'username': 'fresh', 'email': 'fresh@example.org'}, {'username': 'taken', 'email': 'other@example.org'}]
+    assert client.post('/api/users/batch', json={'users': rows}).status_code == 409
+    assert client.get('/api/users?username=fresh').get_json() == []
+    assert client.post('/api/users/batch', json=[{'username': 'x'}]).status_code == 400
+
+
+def test_lookup_by_username_and_email():
+    client = make_client()
+    created = client.post('/api/users', json={'username': 'rana', 'email': 'rana@example.org'}).get_json()
+    assert client.get('/api/users?username=rana').get_json() == [created]
+    assert client.get('/api/users?email=rana@example.org').get_json() == [created]
+
+
+def test_token_is_required(monkeypatch):
+    assert make_client(token=None).get('/api/users').status_code == 401
+    assert make_client(token='wrong').get('/api/users').status_code == 401
+    monkeypatch.setitem(app.config, 'MMR_USERS_TOKEN', None)
+    assert make_client().get('/api/users').status_code == 403
+
+
+def test_create_user_needs_username_and_email():
+    client = make_client()
+    assert client.post('/api/users', json={'username': 'x'}).status_code == 400
+    assert client.post('/api/users', json=['x']).status_code == 400